@@ -0,0 +1,58 @@
+import polars as pl
+import pytest
+from kedro.io.core import DataSetError
+
+from udacity_de_capstone.extras.datasets.csv_source import CSVSource, CSVSourceDataSet
+
+
+@pytest.fixture
+def files(tmp_path):
+    pl.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]}).write_csv(tmp_path / "f_1.csv")
+    # inferred as strings on its own
+    pl.DataFrame({"a": ["4", "5"], "b": ["u", "v"]}).write_csv(tmp_path / "f_2.csv")
+    return str(tmp_path / "f_*.csv")
+
+
+class TestCSVSource:
+    def test_files(self, files, tmp_path):
+        source = CSVSource(files)
+        assert source.files == [str(tmp_path / "f_1.csv"), str(tmp_path / "f_2.csv")]
+        assert source.dtypes == {"a": pl.Int64, "b": pl.Utf8}
+
+    def test_read_scan_and_batches(self, files):
+        source = CSVSource(files)
+        expected = pl.DataFrame({"a": [1, 2, 3, 4, 5], "b": list("xyzuv")})
+        assert source.read().frame_equal(expected)
+        assert source.scan().collect().frame_equal(expected)
+        batches = list(source.iter_batches(2))
+        assert pl.concat(batches).frame_equal(expected)
+        assert len(batches) >= 2
+
+    def test_file_source_uses_schema_of_all_files(self, files, tmp_path):
+        source = CSVSource(files).file_source(str(tmp_path / "f_2.csv"))
+        assert source.read()["a"].dtype == pl.Int64
+
+    def test_explicit_dtypes(self, files):
+        source = CSVSource(files, {"dtypes": {"a": pl.Float64, "b": pl.Utf8}})
+        assert source.read()["a"].dtype == pl.Float64
+
+    def test_no_files(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            CSVSource(str(tmp_path / "missing_*.csv")).read()
+
+
+class TestCSVSourceDataSet:
+    def test_load(self, files):
+        dataset = CSVSourceDataSet(files, load_args={"separator": ","})
+        assert dataset.exists()
+        source = dataset.load()
+        assert isinstance(source, CSVSource)
+        assert source.load_args == {"separator": ","}
+        assert len(source.files) == 2
+
+    def test_read_only(self, files):
+        with pytest.raises(DataSetError, match="read only"):
+            CSVSourceDataSet(files).save(CSVSource(files))
+
+    def test_missing(self, tmp_path):
+        assert not CSVSourceDataSet(str(tmp_path / "missing_*.csv")).exists()
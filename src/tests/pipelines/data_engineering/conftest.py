@@ -0,0 +1,108 @@
+import random
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+import polars as pl
+import pytest
+
+AIRPORTS = {"ATL": (33.64, -84.43), "BOS": (42.36, -71.01), "SEA": (47.45, -122.31)}
+
+
+def raw_flights(n: int, first_date: date, days: int, seed: int) -> pl.DataFrame:
+    """Raw flights in the format of the BTS departure dataset"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        fl_date = first_date + timedelta(days=rng.randrange(days))
+        origin, destination = rng.sample(sorted(AIRPORTS), 2)
+        departure = datetime.combine(fl_date, datetime.min.time()) + timedelta(
+            minutes=rng.randrange(24 * 60)
+        )
+        rows.append(
+            {
+                "FL_DATE": fl_date.isoformat(),
+                "DEP_HOUR": departure.hour,
+                "MKT_UNIQUE_CARRIER": rng.choice(["AA", "DL"]),
+                "MKT_CARRIER_FL_NUM": rng.randrange(1, 9999),
+                "OP_UNIQUE_CARRIER": rng.choice(["AA", "DL", "UA"]),
+                "OP_CARRIER_FL_NUM": rng.randrange(1, 9999),
+                "TAIL_NUM": f"N{seed}{i:05d}",
+                "ORIGIN": origin,
+                "DEST": destination,
+                "DEP_TIME": departure.isoformat(sep=" "),
+                "CRS_DEP_TIME": departure.isoformat(sep=" "),
+                "TAXI_OUT": rng.randrange(30),
+                "DEP_DELAY": rng.randrange(-10, 120),
+                "AIR_TIME": rng.randrange(30, 300),
+                "DISTANCE": rng.randrange(100, 3000),
+                "CANCELLED": rng.choice([0, 0, 0, 1]),
+                "LATITUDE": AIRPORTS[origin][0],
+                "LONGITUDE": AIRPORTS[origin][1],
+                "ELEVATION": 10,
+                "MESONET_STATION": f"K{origin}",
+                "YEAR OF MANUFACTURE": rng.randrange(1990, 2020),
+                "MANUFACTURER": rng.choice(["BOEING", "AIRBUS"]),
+                "ICAO TYPE": rng.choice(["B738", "A320"]),
+                "RANGE": rng.choice(["Short", "Medium"]),
+                "WIDTH": "Narrow",
+                "WIND_DIR": 1.0,
+                "WIND_SPD": float(rng.randrange(20)),
+                "WIND_GUST": 12.5,
+                "VISIBILITY": 10.0,
+                "TEMPERATURE": float(rng.randrange(-10, 30)),
+                "DEW_POINT": 5.0,
+                "REL_HUMIDITY": 50.0,
+                "ALTIMETER": 30.0,
+                "LOWEST_CLOUD_LAYER": 1.0,
+                "N_CLOUD_LAYER": 1.0,
+                "LOW_LEVEL_CLOUD": 1.0,
+                "MID_LEVEL_CLOUD": 0.0,
+                "HIGH_LEVEL_CLOUD": 0.0,
+                "CLOUD_COVER": 4.0,
+                "ACTIVE_WEATHER": float(rng.choice([0, 1, 2])),
+            }
+        )
+    return pl.DataFrame(rows)
+
+
+@pytest.fixture
+def write_flights(tmp_path, monkeypatch) -> Callable[..., Path]:
+    """Writes raw flight files into `raw/` of a project directory (the working
+    directory of the test), e.g. for yearly files of a backfill
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "raw").mkdir()
+
+    def _write(
+        name: str, first_date: date, n: int = 300, days: int = 45, seed: int = 0
+    ) -> Path:
+        path = Path("raw") / name
+        raw_flights(n, first_date, days, seed).write_csv(path)
+        return path
+
+    return _write
+
+
+@pytest.fixture
+def airports() -> pl.DataFrame:
+    """Transformed airports, in the format of ``transform_airports``"""
+    return pl.DataFrame(
+        {
+            "airport": pl.Series(["SEA", "ATL", "BOS"], dtype=pl.Categorical),
+            "latitude": [AIRPORTS[a][0] for a in ("SEA", "ATL", "BOS")],
+            "longitude": [AIRPORTS[a][1] for a in ("SEA", "ATL", "BOS")],
+        }
+    )
+
+
+@pytest.fixture
+def flights_params() -> dict:
+    return {
+        "out_of_core": False,
+        "chunk_rows": 50,
+        "spill_dir": "spill",
+        "max_workers": 2,
+        "resume": True,
+        "sample": None,
+    }
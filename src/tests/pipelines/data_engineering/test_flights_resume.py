@@ -0,0 +1,185 @@
+import json
+import os
+from datetime import date
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from udacity_de_capstone.extras.datasets.csv_source import CSVSource
+from udacity_de_capstone.pipelines.data_engineering import nodes
+from udacity_de_capstone.pipelines.data_engineering.nodes import transform_flights
+
+FILES = "raw/CompleteData_*.csv"
+
+
+@pytest.fixture
+def flights_params(flights_params):
+    # also for a single file, e.g. after deleting the others
+    return {**flights_params, "out_of_core": True}
+
+
+@pytest.fixture
+def spilled(monkeypatch):
+    """Records the input files read (i.e. spilled) by out-of-core runs"""
+    paths = []
+    iter_batches = CSVSource.iter_batches
+
+    def _iter_batches(self, batch_rows):
+        paths.append(self.filepath)
+        return iter_batches(self, batch_rows)
+
+    monkeypatch.setattr(CSVSource, "iter_batches", _iter_batches)
+    return paths
+
+
+@pytest.fixture
+def backfill(write_flights):
+    """Two yearly files, with flights of both years in December / January"""
+    return [
+        write_flights("CompleteData_2021.csv", date(2021, 12, 1), seed=1),
+        write_flights("CompleteData_2022.csv", date(2022, 1, 1), seed=2),
+    ]
+
+
+def _run(airports, params, source=None):
+    partitions, stats = transform_flights(source or CSVSource(FILES), airports, params)
+    frames = {
+        key: load().with_columns(pl.col(pl.Categorical).cast(pl.Utf8))
+        for key, load in partitions.items()
+    }
+    return frames, {key: load() for key, load in stats.items()}
+
+
+def _assert_frames_equal(left, right):
+    assert list(left) == list(right)
+    for key in left:
+        assert left[key].frame_equal(right[key], null_equal=True), key
+
+
+def _manifest(params):
+    with open(Path(params["spill_dir"]) / "manifest.json", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _spills(params, path):
+    return sorted(Path(params["spill_dir"]).glob(f"*/{Path(path).stem}_*.arrow"))
+
+
+class TestResume:
+    def test_completed_files_are_reused(
+        self, backfill, airports, flights_params, spilled
+    ):
+        first, _ = _run(airports, flights_params)
+        assert sorted(spilled) == [str(p) for p in backfill]
+        assert list(first) == ["flights_2021_12", "flights_2022_01", "flights_2022_02"]
+        assert sorted(_manifest(flights_params)["files"]) == [str(p) for p in backfill]
+
+        spilled.clear()
+        second, stats = _run(airports, flights_params)
+        assert spilled == []
+        _assert_frames_equal(first, second)
+        assert sum(s["row_count"] for s in stats.values()) == 600
+
+    def test_without_resume(self, backfill, airports, flights_params, spilled):
+        _run(airports, flights_params)
+        spilled.clear()
+        _run(airports, {**flights_params, "resume": False})
+        assert sorted(spilled) == [str(p) for p in backfill]
+
+    @pytest.mark.parametrize("change", ["mtime", "size"])
+    def test_changed_files_are_spilled_again(
+        self, backfill, airports, flights_params, spilled, write_flights, change
+    ):
+        _run(airports, flights_params)
+        spills_before = _spills(flights_params, backfill[0])
+
+        changed = backfill[1]
+        if change == "mtime":
+            stat = os.stat(changed)
+            os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        else:
+            write_flights(changed.name, date(2022, 1, 1), n=200, seed=3)
+
+        spilled.clear()
+        frames, _ = _run(airports, flights_params)
+        assert spilled == [str(changed)]
+        assert _spills(flights_params, backfill[0]) == spills_before
+        assert sum(df.height for df in frames.values()) == (
+            600 if change == "mtime" else 500
+        )
+        spilled.clear()
+        _run(airports, flights_params)
+        assert spilled == []
+
+    def test_spills_of_deleted_files_are_removed(
+        self, backfill, airports, flights_params, spilled
+    ):
+        _run(airports, flights_params)
+        assert _spills(flights_params, backfill[1])
+
+        backfill[1].unlink()
+        spilled.clear()
+        frames, _ = _run(airports, flights_params)
+        assert spilled == []
+        assert _spills(flights_params, backfill[1]) == []
+        assert list(_manifest(flights_params)["files"]) == [str(backfill[0])]
+        assert sum(df.height for df in frames.values()) == 300
+        assert all(df["tail_num"].str.starts_with("N1").all() for df in frames.values())
+
+    @pytest.mark.parametrize(
+        "change",
+        ["sample", "load_args", "schema"],
+        ids=["sample", "load_args", "schema"],
+    )
+    def test_settings_change_resets_manifest(
+        self, backfill, airports, flights_params, spilled, write_flights, change
+    ):
+        _run(airports, flights_params)
+        source, params = CSVSource(FILES), flights_params
+        if change == "sample":
+            params = {**flights_params, "sample": {"fraction": 0.5}}
+        elif change == "load_args":
+            source = CSVSource(FILES, {"null_values": ["NA"]})
+        else:
+            # data types are inferred from the first file
+            path = backfill[0]
+            pl.read_csv(path).with_columns(
+                pl.col("DEP_DELAY").cast(pl.Float64)
+            ).write_csv(path)
+            os.utime(path, ns=(0, os.stat(backfill[1]).st_mtime_ns))
+
+        spilled.clear()
+        frames, _ = _run(airports, params, source)
+        assert sorted(spilled) == [str(p) for p in backfill]
+        manifest = _manifest(flights_params)
+        assert sorted(manifest["files"]) == [str(p) for p in backfill]
+        if change == "schema":
+            assert manifest["settings"]["dtypes"]["DEP_DELAY"] == "Float64"
+            assert all(df["dep_delay"].dtype == pl.Float64 for df in frames.values())
+
+    def test_crash_before_manifest_update(
+        self, backfill, airports, flights_params, spilled, monkeypatch
+    ):
+        params = {**flights_params, "max_workers": 1}
+        expected, _ = _run(airports, {**params, "spill_dir": "spill_expected"})
+
+        mark_completed = nodes.mark_completed
+
+        def _crash(manifest, path, outputs):
+            if path == str(backfill[1]):
+                raise RuntimeError("interrupted")
+            mark_completed(manifest, path, outputs)
+
+        monkeypatch.setattr(nodes, "mark_completed", _crash)
+        with pytest.raises(RuntimeError, match="interrupted"):
+            _run(airports, params)
+        # the spills were written, but the file was not recorded as completed
+        assert _spills(params, backfill[1])
+        assert list(_manifest(params)["files"]) == [str(backfill[0])]
+
+        monkeypatch.setattr(nodes, "mark_completed", mark_completed)
+        spilled.clear()
+        frames, _ = _run(airports, params)
+        assert spilled == [str(backfill[1])]
+        _assert_frames_equal(frames, expected)
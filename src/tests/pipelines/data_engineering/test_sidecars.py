@@ -0,0 +1,125 @@
+import random
+from datetime import date, timedelta
+from typing import Callable, Dict
+
+import polars as pl
+import pytest
+from kedro.extras.datasets.json import JSONDataSet
+
+from udacity_de_capstone.partition_stats import PartitionStats, compute_partition_stats
+from udacity_de_capstone.pipelines.data_engineering.nodes import (
+    _departure_airport_plan,
+    _route_counts_plan,
+    _run_generic_dq,
+    agg_by_departure_airport,
+    dq_flights,
+)
+
+AIRPORTS = {"ATL": (33.64, -84.43), "BOS": (42.36, -71.01), "SEA": (47.45, -122.31)}
+
+
+def _flights(n: int, month: date, seed: int) -> pl.DataFrame:
+    rng = random.Random(seed)
+    # KOA only departs, so it is dropped from the departure airport aggregate
+    routes = [(o, d) for o in AIRPORTS for d in AIRPORTS if o != d] + [("KOA", "SEA")]
+    rows = []
+    for i in range(n):
+        origin, destination = rng.choice(routes)
+        rows.append(
+            {
+                "fl_date": month + timedelta(days=rng.randrange(28)),
+                "tail_num": f"N{seed}{i:05d}",
+                "origin": origin,
+                "destination": destination,
+                "op_unique_carrier": rng.choice(["AA", "DL", "UA"]),
+                "mkt_unique_carrier": rng.choice(["AA", "DL"]),
+                "latitude": AIRPORTS.get(origin, (19.74, -156.05))[0],
+                "longitude": AIRPORTS.get(origin, (19.74, -156.05))[1],
+            }
+        )
+    return pl.DataFrame(rows)
+
+
+@pytest.fixture
+def partitions() -> Dict[str, pl.DataFrame]:
+    return {
+        "combined_2022_01": _flights(300, date(2022, 1, 1), seed=1),
+        "combined_2022_02": _flights(200, date(2022, 2, 1), seed=2),
+        "combined_2022_03": _flights(5, date(2022, 3, 1), seed=3),
+    }
+
+
+def _sidecars(
+    partitions: Dict[str, pl.DataFrame], directory
+) -> Dict[str, Callable[[], PartitionStats]]:
+    """Sidecars as written by the nodes and read by a `PartitionedDataSet`"""
+    sidecars = {}
+    for partition_id, df in partitions.items():
+        stats = compute_partition_stats(df)
+        stats["route_counts"] = _route_counts_plan(df.lazy()).collect().rows()
+        dataset = JSONDataSet(str(directory / f"{partition_id}.stats.json"))
+        dataset.save(stats)
+        sidecars[partition_id] = dataset.load
+    return sidecars
+
+
+def test_agg_by_departure_airport_from_sidecars(partitions, tmp_path):
+    result = agg_by_departure_airport(_sidecars(partitions, tmp_path))
+
+    data = pl.concat(list(partitions.values())).lazy()
+    expected = _departure_airport_plan(_route_counts_plan(data)).collect()
+    assert result.schema == expected.schema
+    assert result.sort("origin").frame_equal(expected.sort("origin"))
+    assert sorted(result["origin"]) == ["ATL", "BOS", "SEA"]
+    assert (
+        result["count_departures"].sum()
+        == data.filter(pl.col("origin") != "KOA").collect().height
+    )
+
+
+def test_dq_flights_passes(partitions, tmp_path):
+    flights = {partition_id: df.clone for partition_id, df in partitions.items()}
+    validated, stats = dq_flights(flights, _sidecars(partitions, tmp_path))
+    assert validated is flights
+    assert {p: s["row_count"] for p, s in stats.items()} == {
+        p: df.height for p, df in partitions.items()
+    }
+
+
+@pytest.mark.parametrize(
+    "corrupt, error",
+    [
+        (lambda df: df.clear(), "Empty DataFrame!"),
+        (lambda df: pl.concat([df, df.head(1)]), "Duplicate airport entries found!"),
+        (
+            lambda df: df.with_columns(pl.lit(95.0).alias("latitude")),
+            r"Latitutes outside \[-90, 90\]",
+        ),
+        (
+            lambda df: df.with_columns(pl.lit(-181.0).alias("longitude")),
+            r"Longitudes outside \[-180, 180\]",
+        ),
+    ],
+)
+def test_dq_flights_generic_checks(partitions, tmp_path, corrupt, error):
+    partitions["combined_2022_02"] = corrupt(partitions["combined_2022_02"])
+
+    # sidecars answer the same as the data
+    with pytest.raises(ValueError, match=error):
+        _run_generic_dq(partitions["combined_2022_02"])
+    with pytest.raises(ValueError, match=error):
+        dq_flights(dict.fromkeys(partitions), _sidecars(partitions, tmp_path))
+
+
+def test_dq_flights_null_checks(partitions, tmp_path):
+    partitions["combined_2022_03"] = partitions["combined_2022_03"].with_columns(
+        pl.when(pl.col("tail_num").str.ends_with("2"))
+        .then(None)
+        .otherwise(pl.col("origin"))
+        .alias("origin")
+    )
+    with pytest.raises(
+        ValueError,
+        match="in combined_2022_03 partition!.*'origin': 1, 'destination': 0",
+    ):
+        dq_flights(dict.fromkeys(partitions), _sidecars(partitions, tmp_path))
@@ -0,0 +1,105 @@
+from datetime import date
+
+import polars as pl
+import pytest
+
+from udacity_de_capstone.extras.datasets.csv_source import CSVSource
+from udacity_de_capstone.pipelines.data_engineering.nodes import (
+    _transform_flights_in_memory,
+    _transform_flights_out_of_core,
+)
+
+
+@pytest.fixture
+def source(write_flights):
+    """Flights of three files, with months spread across files"""
+    write_flights("CompleteData_1.csv", date(2021, 12, 10), n=400, seed=1)
+    write_flights("CompleteData_2.csv", date(2022, 1, 5), n=300, seed=2)
+    write_flights("CompleteData_3.csv", date(2022, 1, 20), n=200, days=20, seed=3)
+    return CSVSource("raw/CompleteData_*.csv")
+
+
+def _in_memory(source, airports, params):
+    return _transform_flights_in_memory(source, airports, params)
+
+
+def _out_of_core(source, airports, params):
+    partitions, stats = _transform_flights_out_of_core(source, airports, params)
+    frames = {key: load() for key, load in partitions.items()}
+    return frames, {key: load() for key, load in stats.items()}
+
+
+def _assert_same_partitions(left, right):
+    left_frames, left_stats = left
+    right_frames, right_stats = right
+    assert sorted(left_frames) == sorted(right_frames)
+    for key, df in left_frames.items():
+        assert df.schema == right_frames[key].schema, key
+        assert (
+            df.sort("tail_num")
+            .with_columns(pl.col(pl.Categorical).cast(pl.Utf8))
+            .frame_equal(
+                right_frames[key]
+                .sort("tail_num")
+                .with_columns(pl.col(pl.Categorical).cast(pl.Utf8)),
+                null_equal=True,
+            )
+        ), key
+
+        stats, other = left_stats[key], right_stats[key]
+        for field in ("row_count", "duplicate_row_count", "airport_index"):
+            assert stats[field] == other[field], (key, field)
+        for col, col_stats in stats["columns"].items():
+            assert {k: v for k, v in col_stats.items() if k != "n_unique"} == {
+                k: v for k, v in other["columns"][col].items() if k != "n_unique"
+            }, (key, col)
+
+
+def test_out_of_core_matches_in_memory(source, airports, flights_params):
+    in_memory = _in_memory(source, airports, flights_params)
+    assert sorted(in_memory[0]) == [
+        "flights_2021_12",
+        "flights_2022_01",
+        "flights_2022_02",
+    ]
+    assert sum(df.height for df in in_memory[0].values()) == 900
+    assert in_memory[0]["flights_2022_01"]["origin_airport_index"].null_count() == 0
+
+    out_of_core = _out_of_core(source, airports, flights_params)
+    _assert_same_partitions(in_memory, out_of_core)
+
+
+@pytest.mark.parametrize(
+    "sample",
+    [
+        {"fraction": 0.3, "seed": 7},
+        {"months": ["2022-01"], "carriers": ["AA", "UA"], "fraction": 0.5},
+    ],
+)
+def test_same_sample_in_both_modes(source, airports, flights_params, sample):
+    params = {**flights_params, "sample": sample}
+    in_memory = _in_memory(source, airports, params)
+    sampled = sum(df.height for df in in_memory[0].values())
+    assert 0 < sampled < 900 * sample["fraction"] * 1.5
+
+    # the sample does not depend on how flights are chunked
+    for chunk_rows in (7, 1000):
+        out_of_core = _out_of_core(
+            source,
+            airports,
+            {**params, "chunk_rows": chunk_rows, "spill_dir": f"spill_{chunk_rows}"},
+        )
+        _assert_same_partitions(in_memory, out_of_core)
+
+    # sampled flights are a subset of all flights, regardless of the seed used
+    everything = pl.concat(
+        [
+            df.with_columns(pl.col(pl.Categorical).cast(pl.Utf8))
+            for df in _in_memory(source, airports, flights_params)[0].values()
+        ]
+    )
+    for df in in_memory[0].values():
+        assert df["tail_num"].is_in(everything["tail_num"]).all()
+        if "months" in sample:
+            assert df["fl_date"].dt.strftime("%Y-%m").unique().to_list() == ["2022-01"]
+            assert set(df["op_unique_carrier"]) <= {"AA", "UA"}
@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from udacity_de_capstone.pipelines.network.graph import (
+    CSRGraph,
+    alternative_paths,
+    hits,
+    neighbour_bitsets,
+    pagerank,
+    reachable_within,
+)
+
+
+def _graph(edges, n=4, weights=None):
+    sources, targets = zip(*edges)
+    if weights is None:
+        weights = [1.0] * len(edges)
+    return CSRGraph.from_edges(
+        np.array(sources), np.array(targets), np.array(weights), n
+    )
+
+
+@pytest.fixture
+def chain_with_shortcut():
+    # 0 -> 1 -> 2 -> 3, and 0 -> 2; node 3 is dangling
+    return _graph([(2, 3), (0, 2), (1, 2), (0, 1)])
+
+
+class TestCSRGraph:
+    def test_from_edges(self, chain_with_shortcut):
+        graph = chain_with_shortcut
+        assert graph.indptr.tolist() == [0, 2, 3, 4, 4]
+        assert graph.sources.tolist() == [0, 0, 1, 2]
+        assert graph.indices.tolist() == [2, 1, 2, 3]
+        assert graph.out_degree().tolist() == [2, 1, 1, 0]
+        assert graph.in_degree().tolist() == [0, 1, 2, 1]
+
+    def test_transpose(self, chain_with_shortcut):
+        transposed = chain_with_shortcut.transpose()
+        assert transposed.out_degree().tolist() == [0, 1, 2, 1]
+        assert sorted(zip(transposed.sources, transposed.indices)) == [
+            (1, 0),
+            (2, 0),
+            (2, 1),
+            (3, 2),
+        ]
+
+    def test_empty(self):
+        graph = CSRGraph.from_edges(np.array([]), np.array([]), np.array([]), 0)
+        assert graph.n_nodes == 0
+        assert reachable_within(graph, 2).tolist() == []
+
+
+class TestReachability:
+    def test_neighbour_bitsets(self, chain_with_shortcut):
+        bitsets = np.unpackbits(neighbour_bitsets(chain_with_shortcut), axis=1)
+        assert bitsets[:, :4].tolist() == [
+            [0, 1, 1, 0],
+            [0, 0, 1, 0],
+            [0, 0, 0, 1],
+            [0, 0, 0, 0],
+        ]
+
+    @pytest.mark.parametrize(
+        "max_hops,expected",
+        [(0, [0, 0, 0, 0]), (1, [2, 1, 1, 0]), (2, [3, 2, 1, 0]), (5, [3, 2, 1, 0])],
+    )
+    def test_reachable_within(self, chain_with_shortcut, max_hops, expected):
+        assert reachable_within(chain_with_shortcut, max_hops).tolist() == expected
+
+    def test_reachable_within_cycle(self):
+        cycle = _graph([(0, 1), (1, 2), (2, 3), (3, 0)])
+        assert reachable_within(cycle, 2).tolist() == [2, 2, 2, 2]
+        assert reachable_within(cycle, 3).tolist() == [3, 3, 3, 3]
+
+    def test_alternative_paths(self, chain_with_shortcut):
+        # aligned with the edges 0 -> 2, 0 -> 1, 1 -> 2, 2 -> 3;
+        # only 0 -> 2 has a one-stop alternative (via 1)
+        assert alternative_paths(chain_with_shortcut).tolist() == [1, 0, 0, 0]
+
+
+def _dense_pagerank(adjacency, damping=0.85, iterations=200):
+    n = len(adjacency)
+    out_strength = adjacency.sum(axis=1, keepdims=True)
+    transition = np.where(
+        out_strength > 0, adjacency / np.where(out_strength > 0, out_strength, 1), 1 / n
+    )
+    rank = np.full(n, 1 / n)
+    for _ in range(iterations):
+        rank = (1 - damping) / n + damping * rank @ transition
+    return rank
+
+
+class TestPageRank:
+    def test_cycle_is_uniform(self):
+        cycle = _graph([(0, 1), (1, 2), (2, 3), (3, 0)])
+        np.testing.assert_allclose(pagerank(cycle), [0.25] * 4)
+
+    def test_matches_dense_power_iteration(self):
+        edges = [(2, 3), (0, 2), (1, 2), (0, 1), (3, 1)]
+        weights = [1.0, 3.0, 2.0, 1.0, 0.5]
+        adjacency = np.zeros((4, 4))
+        for (source, target), weight in zip(edges, weights):
+            adjacency[source, target] = weight
+        rank = pagerank(_graph(edges, weights=weights))
+        np.testing.assert_allclose(rank, _dense_pagerank(adjacency), atol=1e-9)
+        assert rank.sum() == pytest.approx(1)
+
+    def test_dangling_nodes_keep_total_rank(self, chain_with_shortcut):
+        rank = pagerank(chain_with_shortcut)
+        assert rank.sum() == pytest.approx(1)
+        # rank flows down the chain, node 0 has no incoming edges
+        assert rank[0] == rank.min()
+        assert rank[3] == rank.max()
+
+
+class TestHits:
+    def test_star(self):
+        star = _graph([(0, 1), (0, 2), (0, 3)])
+        hubs, authorities = hits(star)
+        np.testing.assert_allclose(hubs, [1, 0, 0, 0], atol=1e-9)
+        np.testing.assert_allclose(authorities, [0, *[1 / np.sqrt(3)] * 3], atol=1e-9)
+
+    def test_weighted_authorities(self):
+        graph = _graph([(0, 1), (0, 2)], n=3, weights=[3.0, 4.0])
+        hubs, authorities = hits(graph)
+        np.testing.assert_allclose(hubs, [1, 0, 0], atol=1e-9)
+        np.testing.assert_allclose(authorities, [0, 0.6, 0.8], atol=1e-9)
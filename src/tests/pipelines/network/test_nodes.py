@@ -0,0 +1,70 @@
+from datetime import date
+
+import polars as pl
+import pytest
+
+from udacity_de_capstone.pipelines.network.nodes import (
+    _metrics_schema,
+    agg_route_network,
+    route_network_metrics,
+)
+
+PARAMS = {"max_hops": 2, "damping": 0.85, "max_iterations": 100, "tolerance": 1e-10}
+
+
+def _flights(routes):
+    return pl.DataFrame(
+        {
+            "fl_date": [date(2021, 1, 1 + i) for i in range(len(routes))],
+            "origin": [origin for origin, _, _ in routes],
+            "destination": [destination for _, destination, _ in routes],
+            "dep_delay": [delay for _, _, delay in routes],
+        }
+    )
+
+
+class TestRouteNetworkMetrics:
+    def test_metrics(self):
+        flights = _flights(
+            [
+                ("ATL", "BOS", 10.0),
+                ("ATL", "BOS", 20.0),
+                ("ATL", "CHI", 0.0),
+                ("BOS", "CHI", 5.0),
+                ("CHI", "CHI", 99.0),  # not a route
+            ]
+        )
+        metrics = route_network_metrics(flights, PARAMS)
+        assert metrics.schema == _metrics_schema()
+        assert metrics["airport"].to_list() == ["ATL", "BOS", "CHI"]
+        assert metrics["out_degree"].to_list() == [2, 1, 0]
+        assert metrics["count_departures"].to_list() == [3, 1, 0]
+        assert metrics["count_arrivals"].to_list() == [0, 2, 2]
+        assert metrics["count_reachable_airports"].to_list() == [2, 1, 0]
+        # ATL -> CHI has an alternative via BOS
+        assert metrics["count_redundant_routes"].to_list() == [1, 0, 0]
+        assert metrics["avg_departure_delay"].to_list()[:2] == [10.0, 5.0]
+        assert metrics["pagerank"].sum() == pytest.approx(1)
+
+    def test_no_routes(self):
+        flights = _flights([("ATL", "ATL", 1.0)])
+        metrics = route_network_metrics(flights, PARAMS)
+        assert metrics.is_empty()
+        assert metrics.schema == _metrics_schema()
+
+
+class TestAggRouteNetwork:
+    def test_empty_partitions(self):
+        empty = _flights([("ATL", "ATL", 1.0)]).clear()
+        result = agg_route_network({"2021-01": lambda: empty}, PARAMS)
+        assert result.is_empty()
+        assert result.schema == {"month": pl.Date, **_metrics_schema()}
+
+    def test_months(self):
+        data = {
+            "2021-01": lambda: _flights([("ATL", "BOS", 1.0)]),
+            "2021-02": lambda: _flights([("ATL", "ATL", 1.0)]),
+        }
+        result = agg_route_network(data, PARAMS)
+        assert result["month"].unique().to_list() == [date(2021, 1, 1)]
+        assert result["airport"].to_list() == ["BOS", "ATL"]
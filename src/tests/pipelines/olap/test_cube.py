@@ -0,0 +1,161 @@
+from datetime import date
+
+import numpy as np
+import polars as pl
+import pytest
+
+from udacity_de_capstone.pipelines.olap.cube import (
+    CUBE_MEASURES,
+    approx_delay_quantile,
+    build_cube,
+    roll_up,
+)
+
+BUCKET_EDGES = [0, 15, 60]
+
+
+@pytest.fixture
+def flights():
+    rng = np.random.default_rng(42)
+    n = 500
+    delays = rng.normal(10, 30, n).round()
+    return pl.DataFrame(
+        {
+            "fl_date": [date(2021, 1 + i % 3, 1 + i % 28) for i in range(n)],
+            "op_unique_carrier": rng.choice(["AA", "DL", "UA"], n),
+            "origin_state_code": rng.choice(["CA", "NY", "TX"], n),
+            "destination_state_code": rng.choice(["CA", "NY", "TX"], n),
+            "cancelled": rng.random(n) < 0.05,
+            # a few missing delays, e.g. of cancelled flights
+            "dep_delay": pl.Series(delays).set(pl.Series(rng.random(n) < 0.05), None),
+            "taxi_out": rng.integers(5, 40, n).astype(float),
+            "air_time": rng.integers(30, 400, n).astype(float),
+            "distance": rng.integers(100, 3000, n).astype(float),
+        }
+    )
+
+
+@pytest.fixture
+def cube(flights):
+    return build_cube(flights.lazy(), BUCKET_EDGES).collect()
+
+
+def _direct(flights, by):
+    """Measures of the rolled up cube, computed directly from the flights"""
+    aggregations = [
+        pl.count().alias("count_flights"),
+        pl.min("dep_delay").alias("min_dep_delay"),
+        pl.max("dep_delay").alias("max_dep_delay"),
+    ]
+    for col in CUBE_MEASURES:
+        count = pl.col(col).is_not_null().sum()
+        aggregations += [
+            count.alias(f"count_{col}"),
+            pl.mean(col).alias(f"avg_{col}"),
+            # the sample std is undefined for a single value
+            pl.when(count > 1).then(pl.std(col)).alias(f"std_{col}"),
+        ]
+    return flights.groupby(*by).agg(aggregations).sort(*by)
+
+
+class TestRollUp:
+    @pytest.mark.parametrize(
+        "by",
+        [
+            ["op_unique_carrier"],
+            ["origin_state_code", "destination_state_code"],
+            ["fl_date", "op_unique_carrier"],
+        ],
+    )
+    def test_matches_direct_groupby(self, flights, cube, by):
+        rolled = roll_up(cube, by)
+        expected = _direct(flights, by)
+        for col in by:
+            assert rolled[col].to_list() == expected[col].to_list()
+        for col in expected.columns[len(by) :]:
+            np.testing.assert_allclose(
+                rolled[col].cast(pl.Float64).to_numpy(),
+                expected[col].cast(pl.Float64).to_numpy(),
+                rtol=1e-9,
+                err_msg=col,
+            )
+
+    def test_grand_totals(self, flights, cube):
+        rolled = roll_up(cube)
+        assert rolled.height == 1
+        assert rolled["count_flights"].item() == flights.height
+        assert rolled["count_cancelled"].item() == flights["cancelled"].sum()
+        for col in CUBE_MEASURES:
+            assert rolled[f"avg_{col}"].item() == pytest.approx(flights[col].mean())
+            assert rolled[f"std_{col}"].item() == pytest.approx(flights[col].std())
+
+    def test_date_grain_and_filter(self, flights, cube):
+        where = pl.col("op_unique_carrier") == "AA"
+        rolled = roll_up(cube, ["fl_date"], every="1mo", where=where)
+        expected = (
+            flights.filter(where)
+            .groupby(pl.col("fl_date").dt.truncate("1mo"))
+            .agg(pl.count().alias("count_flights"), pl.sum("distance"))
+            .sort("fl_date")
+        )
+        assert rolled["fl_date"].to_list() == [date(2021, m, 1) for m in (1, 2, 3)]
+        assert rolled["count_flights"].to_list() == expected["count_flights"].to_list()
+        assert rolled["sum_distance"].to_list() == expected["distance"].to_list()
+
+    def test_single_flight_has_no_std(self, flights):
+        cube = build_cube(flights.head(1).lazy(), BUCKET_EDGES).collect()
+        rolled = roll_up(cube)
+        assert rolled["std_distance"].item() is None
+        assert rolled["avg_distance"].item() == flights["distance"][0]
+
+    def test_unknown_dimension(self, cube):
+        with pytest.raises(ValueError, match="origin"):
+            roll_up(cube, ["origin"])
+
+
+class TestApproxDelayQuantile:
+    def test_histogram(self, flights, cube):
+        rolled = roll_up(cube)
+        delays = flights["dep_delay"].drop_nulls()
+        buckets = np.digitize(delays.to_numpy(), BUCKET_EDGES)
+        expected = np.bincount(buckets, minlength=len(BUCKET_EDGES) + 1)
+        histogram = rolled.select(pl.col("^count_dep_delay_bucket_.*$")).row(0)
+        assert list(histogram) == expected.tolist()
+        assert sum(histogram) == rolled["count_dep_delay"].item()
+
+    @pytest.mark.parametrize("quantile", [0.1, 0.5, 0.9])
+    def test_within_bucket_of_exact_quantile(self, flights, cube, quantile):
+        rolled = roll_up(cube, ["op_unique_carrier"])
+        approx = approx_delay_quantile(rolled, quantile, BUCKET_EDGES)
+        assert approx.name == f"p{quantile * 100:g}_dep_delay"
+        exact = flights.groupby("op_unique_carrier").agg(
+            pl.quantile("dep_delay", quantile)
+        )
+        bounds = [-np.inf, *BUCKET_EDGES, np.inf]
+        for carrier, value in zip(rolled["op_unique_carrier"], approx):
+            exact_value = exact.filter(pl.col("op_unique_carrier") == carrier)[
+                "dep_delay"
+            ].item()
+            bucket = np.digitize(exact_value, BUCKET_EDGES)
+            # the estimate is interpolated within the bucket of the exact quantile
+            assert bounds[bucket] - 1 <= value <= bounds[bucket + 1] + 1
+
+    def test_uniform_delays(self):
+        flights = pl.DataFrame(
+            {
+                "fl_date": [date(2021, 1, 1)] * 60,
+                "op_unique_carrier": ["AA"] * 60,
+                "origin_state_code": ["CA"] * 60,
+                "destination_state_code": ["NY"] * 60,
+                "cancelled": [False] * 60,
+                "dep_delay": np.arange(60, dtype=float),
+                **{col: [1.0] * 60 for col in ("taxi_out", "air_time", "distance")},
+            }
+        )
+        cube = build_cube(flights.lazy(), [15, 30, 45]).collect()
+        approx = approx_delay_quantile(roll_up(cube), 0.5, [15, 30, 45])
+        assert approx.item() == pytest.approx(30)
+
+    def test_no_delays(self, cube):
+        rolled = roll_up(cube, where=pl.col("op_unique_carrier") == "none")
+        assert approx_delay_quantile(rolled, 0.5, BUCKET_EDGES).to_list() == [None]
@@ -0,0 +1,162 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from udacity_de_capstone.pipelines.spatial.nodes import (
+    EARTH_RADIUS_KM,
+    build_county_index,
+    enrich_airports_spatially,
+)
+
+PARAMS = {
+    "cell_size_deg": 0.5,
+    "catchment_radius_km": 100,
+    "county_search_radius_km": 250,
+}
+
+
+@pytest.fixture
+def counties():
+    rng = np.random.default_rng(7)
+    # contiguous states, Alaska, and both sides of the antimeridian
+    lat = np.concatenate(
+        [rng.uniform(25, 49, 400), rng.uniform(55, 71.5, 60), rng.uniform(50, 54, 20)]
+    )
+    lon = np.concatenate(
+        [
+            rng.uniform(-125, -67, 400),
+            rng.uniform(-168, -141, 60),
+            rng.choice([-1, 1], 20) * rng.uniform(177, 180, 20),
+        ]
+    )
+    # centroids on cell edges
+    lat[:10] = np.round(lat[:10] * 2) / 2
+    lon[:10] = np.round(lon[:10] * 2) / 2
+    # next to the antimeridian
+    lat[-1], lon[-1] = 52.0, 179.9
+    n = len(lat)
+    return pl.DataFrame(
+        {
+            "fips": np.arange(1001, 1001 + n),
+            "latitude": lat,
+            "longitude": lon,
+            "population": rng.integers(1_000, 1_000_000, n),
+        }
+    )
+
+
+@pytest.fixture
+def airports():
+    return pl.DataFrame(
+        {
+            "airport": ["ATL", "BRW", "ADK", "AMC", "EDG", "NWH", "SEA", "HNL"],
+            "latitude": [33.64, 71.29, 51.88, 52.0, 40.0, 40.0, 47.45, 21.32],
+            "longitude": [
+                -84.43,
+                -156.77,
+                -176.65,
+                -179.9,
+                -100.0,
+                -99.9999,
+                -122.31,
+                -157.92,
+            ],
+        }
+    )
+
+
+def _county_index(counties):
+    centroids = pl.DataFrame(
+        {
+            "GEOID": counties["fips"].cast(pl.Utf8).str.zfill(5),
+            "NAME": [f"County {fips}" for fips in counties["fips"]],
+            "USPS": ["XX"] * counties.height,
+            "INTPTLAT": counties["latitude"],
+            "INTPTLONG  ": counties["longitude"],
+        }
+    )
+    metros = pl.DataFrame(
+        {
+            "FIPS State Code": (counties["fips"] // 1000).cast(pl.Utf8),
+            "FIPS County Code": (counties["fips"] % 1000).cast(pl.Utf8),
+            "CBSA Code": (counties["fips"] * 10).cast(pl.Utf8),
+            "CBSA Title": [f"Metro {fips}" for fips in counties["fips"]],
+        }
+    )
+    return build_county_index(
+        centroids, counties.select("fips", "population"), metros, PARAMS
+    )
+
+
+def _distances_km(airports, counties):
+    """Haversine distances between all airports (rows) and counties (columns)"""
+    lat_1, lon_1 = (
+        np.radians(airports[c].to_numpy())[:, None] for c in ("latitude", "longitude")
+    )
+    lat_2, lon_2 = (
+        np.radians(counties[c].to_numpy())[None, :] for c in ("latitude", "longitude")
+    )
+    a = (
+        np.sin((lat_2 - lat_1) / 2) ** 2
+        + np.cos(lat_1) * np.cos(lat_2) * np.sin((lon_2 - lon_1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def test_build_county_index(counties):
+    index = _county_index(counties)
+    assert index.height == counties.height
+    row = index.filter(pl.col("fips") == 1001).row(0, named=True)
+    assert row["cbsa_code"] == 10010
+    assert row["lat_cell"] == int(np.floor(row["latitude"] / 0.5))
+    assert row["lon_cell"] == int(np.floor(row["longitude"] / 0.5))
+
+
+def test_matches_brute_force(counties, airports):
+    result = enrich_airports_spatially(airports, _county_index(counties), PARAMS)
+    distances = _distances_km(airports.sort("airport"), counties)
+    fips = counties["fips"].to_numpy()
+    population = counties["population"].to_numpy()
+
+    for i, row in enumerate(result.iter_rows(named=True)):
+        nearest = distances[i].argmin()
+        if distances[i, nearest] <= PARAMS["county_search_radius_km"]:
+            assert row["county_fips"] == fips[nearest], row["airport"]
+            assert row["county_centroid_distance_km"] == pytest.approx(
+                distances[i, nearest]
+            )
+        else:
+            assert row["county_fips"] is None, row["airport"]
+        in_catchment = distances[i] <= PARAMS["catchment_radius_km"]
+        assert row["count_catchment_counties"] == in_catchment.sum(), row["airport"]
+        assert row["catchment_population"] == population[in_catchment].sum()
+
+    assigned = dict(zip(result["airport"], result["county_fips"]))
+    # far from any county
+    assert assigned["HNL"] is None
+    assert assigned["BRW"] is not None
+    # across the antimeridian
+    assert assigned["AMC"] == counties["fips"][-1]
+
+
+@pytest.mark.parametrize("radius_km", [100, 111.2, 55.6])
+def test_radius_cutoff(counties, radius_km):
+    """Counties at the search radius are found, also if the radius spans
+    a whole number of grid cells, from an airport on a cell edge
+    """
+    km_per_degree = EARTH_RADIUS_KM * np.pi / 180
+    radius_deg = radius_km / km_per_degree
+    county = counties.head(1).with_columns(
+        pl.lit(40.0 - radius_deg * (1 - 1e-9)).alias("latitude"),
+        pl.lit(-100.0).alias("longitude"),
+    )
+    airports = pl.DataFrame(
+        {
+            "airport": ["IN", "OUT"],
+            "latitude": [40.0, 40.0 + radius_deg * 1e-6],
+            "longitude": [-100.0, -100.0],
+        }
+    )
+    params = {**PARAMS, "county_search_radius_km": radius_km}
+    result = enrich_airports_spatially(airports, _county_index(county), params)
+    assert result["county_fips"].to_list() == [county["fips"].item(), None]
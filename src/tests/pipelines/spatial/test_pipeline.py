@@ -0,0 +1,9 @@
+"""
+This is a boilerplate test file for pipeline 'spatial'
+generated using Kedro 0.18.8.
+Please add your pipeline tests here.
+
+Kedro recommends using `pytest` framework, more info about it can be found
+in the official documentation:
+https://docs.pytest.org/en/latest/getting-started.html
+"""
@@ -0,0 +1,134 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import polars as pl
+import pytest
+
+from udacity_de_capstone.partition_stats import compute_partition_stats
+from udacity_de_capstone.pipelines.timeseries.nodes import (
+    SERIES_KEYS,
+    _bin_aggregations,
+    agg_hourly_delays,
+)
+
+PARAMS = {"time_column": "crs_dep_time", "every": "1h", "boundary_margin_hours": 24}
+
+
+@pytest.fixture
+def scheduling(tmp_path):
+    return {
+        "memory_budget_gb": 1,
+        "max_workers": 2,
+        "default_memory_factor": 2.0,
+        "history_dir": str(tmp_path / "history"),
+    }
+
+
+def _flights(first_date: date, days: int, n: int, seed: int) -> pl.DataFrame:
+    """Flights of consecutive days, some departing after midnight of the next day"""
+    rng = np.random.default_rng(seed)
+    fl_dates = [first_date + timedelta(days=int(d)) for d in rng.integers(0, days, n)]
+    minutes = rng.integers(0, 30 * 60, n)
+    delays = rng.integers(-10, 120, n).astype(float)
+    delays[rng.random(n) < 0.1] = np.nan
+    return pl.DataFrame(
+        {
+            "fl_date": fl_dates,
+            "crs_dep_time": [
+                datetime.combine(d, datetime.min.time()) + timedelta(minutes=int(m))
+                for d, m in zip(fl_dates, minutes)
+            ],
+            "origin": rng.choice(["ATL", "BOS", "SEA"], n),
+            "op_unique_carrier": rng.choice(["AA", "DL"], n),
+            "dep_delay": pl.Series(delays, nan_to_null=True).cast(pl.Int64),
+            "active_weather": rng.integers(0, 2, n),
+            "cancelled": (rng.random(n) < 0.05).astype(np.int64),
+        }
+    )
+
+
+def _expected(partitions, key):
+    """Bins of all departures at once"""
+    return (
+        pl.concat(list(partitions.values()))
+        .filter((pl.col("cancelled") == 0) & pl.col("crs_dep_time").is_not_null())
+        .sort("crs_dep_time")
+        .groupby_dynamic("crs_dep_time", every="1h", by=key)
+        .agg(_bin_aggregations())
+        .rename({"crs_dep_time": "hour"})
+        .sort("hour", key)
+        .select("hour", pl.col(key).cast(pl.Categorical), pl.exclude("hour", key))
+    )
+
+
+def _run(partitions, scheduling):
+    data = {p: (lambda df=df: df) for p, df in partitions.items()}
+    stats = {
+        p: (lambda df=df: compute_partition_stats(df)) for p, df in partitions.items()
+    }
+    return dict(zip(SERIES_KEYS, agg_hourly_delays(data, stats, PARAMS, scheduling)))
+
+
+def _assert_series_equal(result, partitions):
+    for name, key in SERIES_KEYS.items():
+        expected = _expected(partitions, key)
+        assert result[name].columns == expected.columns
+        assert result[name].select("hour", pl.col(key).cast(pl.Utf8)).rows() == (
+            expected.select("hour", pl.col(key).cast(pl.Utf8)).rows()
+        )
+        assert result[name].drop(key).frame_equal(expected.drop(key), null_equal=True)
+
+
+class TestAggHourlyDelays:
+    def test_matches_global_binning_across_month_boundaries(self, scheduling):
+        partitions = {
+            "flights_2021-01": _flights(date(2021, 1, 25), 7, 2000, seed=1),
+            "flights_2021-02": _flights(date(2021, 2, 1), 6, 2000, seed=2),
+            "flights_2021-03": _flights(date(2021, 3, 1), 3, 500, seed=3),
+        }
+        # flights of the last day of a month depart in the next month
+        last_day = partitions["flights_2021-01"].filter(
+            pl.col("crs_dep_time") >= datetime(2021, 2, 1)
+        )
+        assert last_day.height > 0
+
+        _assert_series_equal(_run(partitions, scheduling), partitions)
+
+    def test_departures_in_bins_of_other_partitions(self, scheduling, caplog):
+        february = _flights(date(2021, 2, 1), 6, 2000, seed=2)
+        interior_bin = february.filter(
+            (pl.col("crs_dep_time") >= datetime(2021, 2, 3, 10))
+            & (pl.col("crs_dep_time") < datetime(2021, 2, 3, 11))
+            & (pl.col("cancelled") == 0)
+        ).row(0, named=True)
+        # a January flight reported with a departure in the middle of February
+        late = pl.DataFrame(
+            [
+                {
+                    **interior_bin,
+                    "fl_date": date(2021, 1, 31),
+                    "crs_dep_time": datetime(2021, 2, 3, 10, 30),
+                    "dep_delay": 999,
+                }
+            ],
+            schema=february.schema,
+        )
+        partitions = {
+            "flights_2021-01": pl.concat(
+                [_flights(date(2021, 1, 25), 7, 2000, seed=1), late]
+            ),
+            "flights_2021-02": february,
+        }
+
+        result = _run(partitions, scheduling)
+        _assert_series_equal(result, partitions)
+        assert "bins of flights_2021-02 also hold departures" in caplog.text
+        airport_bin = result["airport"].filter(
+            (pl.col("hour") == datetime(2021, 2, 3, 10))
+            & (pl.col("origin") == interior_bin["origin"])
+        )
+        assert airport_bin["count_departures"].item() >= 2
+
+    def test_single_partition(self, scheduling):
+        partitions = {"flights_2021-01": _flights(date(2021, 1, 1), 5, 1000, seed=4)}
+        _assert_series_equal(_run(partitions, scheduling), partitions)
@@ -0,0 +1,111 @@
+import json
+from datetime import date
+
+import polars as pl
+import pytest
+
+from udacity_de_capstone.census import parse_census_json, parse_census_response
+
+ROWS = [
+    ["NAME", "LASTUPDATE", "POP_2021", "state", "county"],
+    ["Doña Ana County, New Mexico", "7/1/2021", "223337", "35", "013"],
+    ["Anchorage Municipality, Alaska", "7/1/2021", "289697", "02", "020"],
+    ["Añasco Municipio, Puerto Rico", None, "25460", "72", "011"],
+]
+DOCUMENT = json.dumps(ROWS, ensure_ascii=False).replace("],", "],\n").encode()
+DTYPES = {"POP_2021": pl.Int64}
+DATE_FORMATS = {"LASTUPDATE": "%m/%d/%Y"}
+
+
+def _expected():
+    return pl.DataFrame(
+        {
+            "NAME": [row[0] for row in ROWS[1:]],
+            "LASTUPDATE": [date(2021, 7, 1), date(2021, 7, 1), None],
+            "POP_2021": [223337, 289697, 25460],
+            "state": ["35", "02", "72"],
+            "county": ["013", "020", "011"],
+        }
+    )
+
+
+def _parse(chunks, **kwargs):
+    return parse_census_json(chunks, dtypes=DTYPES, date_formats=DATE_FORMATS, **kwargs)
+
+
+class TestParseCensusJson:
+    def test_single_chunk(self):
+        assert _parse([DOCUMENT]).frame_equal(_expected(), null_equal=True)
+
+    def test_split_at_every_byte(self):
+        # includes splits within rows, strings and multibyte characters
+        expected = _expected()
+        for split in range(1, len(DOCUMENT)):
+            chunks = [DOCUMENT[:split], DOCUMENT[split:]]
+            assert _parse(chunks).frame_equal(expected, null_equal=True), split
+
+    def test_byte_by_byte(self):
+        chunks = [DOCUMENT[i : i + 1] for i in range(len(DOCUMENT))]
+        assert _parse(chunks).frame_equal(_expected(), null_equal=True)
+
+    @pytest.mark.parametrize("batch_size", [1, 2, 3])
+    def test_batches(self, batch_size):
+        df = _parse([DOCUMENT], batch_size=batch_size)
+        assert df.frame_equal(_expected(), null_equal=True)
+        assert df.n_chunks() == 1
+
+    def test_strings_without_dtypes(self):
+        df = parse_census_json([DOCUMENT])
+        assert df.schema == {name: pl.Utf8 for name in ROWS[0]}
+        assert df.rows() == [tuple(row) for row in ROWS[1:]]
+
+    def test_header_only(self):
+        df = _parse([b' [["NAME", "LASTUPDATE", "POP_2021", "state", "county"]] '])
+        assert df.is_empty()
+        assert df.schema == _expected().schema
+
+    @pytest.mark.parametrize(
+        "document,message",
+        [
+            (b'{"NAME": []}', "not a JSON array"),
+            (b"[]", "no header"),
+            (b'[["NAME"], ["a"]', "ended before the closing bracket"),
+            (b'[["NAME", "state"], ["a"]]', "Expected 2 values per row"),
+            (b"", "ended before the closing bracket"),
+        ],
+    )
+    def test_invalid(self, document, message):
+        with pytest.raises(ValueError, match=message):
+            parse_census_json([document])
+
+    def test_unknown_columns(self):
+        with pytest.raises(ValueError, match="POP_2021"):
+            parse_census_json([b'[["NAME"]]'], dtypes=DTYPES)
+
+
+class _Response:
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+        self.closed = False
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.closed = True
+
+
+def test_parse_census_response():
+    response = _Response(DOCUMENT)
+    df = parse_census_response(
+        response, dtypes=DTYPES, date_formats=DATE_FORMATS, chunk_size=7
+    )
+    assert df.frame_equal(_expected(), null_equal=True)
+    assert response.closed
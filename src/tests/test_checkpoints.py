@@ -0,0 +1,51 @@
+import os
+
+from udacity_de_capstone.checkpoints import (
+    is_completed,
+    load_manifest,
+    mark_completed,
+    matches_settings,
+    new_manifest,
+    save_manifest,
+)
+
+
+def test_manifest_round_trip(tmp_path):
+    path = tmp_path / "manifest.json"
+    assert load_manifest(path) is None
+
+    manifest = new_manifest({"sample": None, "dtypes": {"a": "Int64"}})
+    source = tmp_path / "source.csv"
+    source.write_text("a\n1\n")
+    (tmp_path / "out.arrow").touch()
+    mark_completed(manifest, str(source), ["out.arrow"])
+    save_manifest(path, manifest)
+
+    loaded = load_manifest(path)
+    assert loaded == manifest
+    assert not path.with_suffix(".tmp").exists()
+    assert matches_settings(loaded, {"dtypes": {"a": "Int64"}, "sample": None})
+    assert not matches_settings(loaded, {"dtypes": {"a": "Utf8"}, "sample": None})
+    assert is_completed(loaded, str(source), tmp_path)
+
+
+def test_is_completed(tmp_path):
+    manifest = new_manifest({})
+    source = tmp_path / "source.csv"
+    source.write_text("a\n1\n")
+    output = tmp_path / "out.arrow"
+    output.touch()
+    assert not is_completed(manifest, str(source), tmp_path)
+
+    mark_completed(manifest, str(source), ["out.arrow"])
+    assert is_completed(manifest, str(source), tmp_path)
+
+    # changed source
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert not is_completed(manifest, str(source), tmp_path)
+
+    # missing output
+    mark_completed(manifest, str(source), ["out.arrow"])
+    output.unlink()
+    assert not is_completed(manifest, str(source), tmp_path)
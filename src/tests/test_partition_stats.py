@@ -0,0 +1,96 @@
+from datetime import date, datetime
+
+import polars as pl
+import pytest
+from kedro.extras.datasets.json import JSONDataSet
+
+from udacity_de_capstone.partition_stats import (
+    compute_partition_stats,
+    load_partition_stats,
+    partition_schema,
+    partition_sizes,
+    total_row_count,
+)
+
+
+def test_partition_schema():
+    df = pl.DataFrame(
+        {
+            "fl_date": [date(2022, 1, 1)],
+            "dep_time": [datetime(2022, 1, 1, 8)],
+            "tail_num": ["N1"],
+            "manufacturer": pl.Series(["BOEING"], dtype=pl.Categorical),
+            "origin_airport_index": pl.Series([1], dtype=pl.UInt32),
+        }
+    ).with_columns(pl.col("dep_time").dt.replace_time_zone("UTC"))
+    assert partition_schema(compute_partition_stats(df)) == df.schema
+
+    nested = {"columns": {"delays": {"dtype": str(pl.List(pl.Int64))}}}
+    assert partition_schema(nested) == {"delays": pl.List(pl.Int64)}
+    with pytest.raises(ValueError, match="Not a polars data type: print"):
+        partition_schema({"columns": {"delays": {"dtype": "print('Int64')"}}})
+
+
+@pytest.fixture
+def df() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "fl_date": [date(2022, 1, 2), date(2022, 1, 1), None],
+            "dep_time": [datetime(2022, 1, 2, 8), None, datetime(2022, 1, 1, 23)],
+            "air_time": pl.Series([None, None, None], dtype=pl.Int64),
+            "dep_delay": [-5, 120, 3],
+            "low_level_cloud": [True, False, None],
+            "origin": ["ATL", "BOS", "ATL"],
+            "manufacturer": pl.Series(["BOEING", None, "AIRBUS"], dtype=pl.Categorical),
+        }
+    )
+
+
+def test_sidecar_round_trip(df, tmp_path):
+    stats = compute_partition_stats(df)
+    dataset = JSONDataSet(str(tmp_path / "flights_2022_01.stats.json"))
+    dataset.save(stats)
+    loaded = load_partition_stats({"flights_2022_01": dataset.load})
+
+    assert loaded == {"flights_2022_01": stats}
+    assert stats["row_count"] == 3
+    assert stats["duplicate_row_count"] == 0
+    assert stats["estimated_size"] == df.estimated_size()
+    columns = loaded["flights_2022_01"]["columns"]
+    assert columns["fl_date"] == {
+        "dtype": "Date",
+        "null_count": 1,
+        "n_unique": 3,
+        "min": "2022-01-01",
+        "max": "2022-01-02",
+    }
+    assert columns["dep_time"]["min"] == "2022-01-01T23:00:00"
+    assert columns["air_time"] == {
+        "dtype": "Int64",
+        "null_count": 3,
+        "n_unique": 1,
+        "min": None,
+        "max": None,
+    }
+    assert (columns["dep_delay"]["min"], columns["dep_delay"]["max"]) == (-5, 120)
+    assert (columns["low_level_cloud"]["min"], columns["low_level_cloud"]["max"]) == (
+        False,
+        True,
+    )
+    # no ranges of strings and categories
+    assert columns["origin"] == {"dtype": "Utf8", "null_count": 0, "n_unique": 2}
+    assert columns["manufacturer"]["null_count"] == 1
+    assert "min" not in columns["manufacturer"]
+
+    assert partition_schema(loaded["flights_2022_01"]) == df.schema
+
+
+def test_duplicates_and_sizes(df):
+    duplicated = pl.concat([df.drop("manufacturer"), df.drop("manufacturer").head(2)])
+    stats = {"a": compute_partition_stats(duplicated), "b": compute_partition_stats(df)}
+    assert stats["a"]["duplicate_row_count"] == 4
+    assert total_row_count(stats) == 8
+    assert partition_sizes(stats) == {
+        "a": duplicated.estimated_size(),
+        "b": df.estimated_size(),
+    }
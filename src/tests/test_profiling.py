@@ -0,0 +1,139 @@
+import csv
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import polars as pl
+import pytest
+from kedro.framework.hooks import _create_hook_manager
+from kedro.io import DataCatalog, MemoryDataSet, PartitionedDataSet
+from kedro.pipeline import node, pipeline
+from kedro.runner import SequentialRunner, ThreadRunner
+
+from udacity_de_capstone.hooks import ProfilingHooks
+from udacity_de_capstone.profiling import NO_NODE, QueryProfiler
+from udacity_de_capstone.utils import map_in_context
+
+LAZY_SAVE_SECONDS = 0.2
+
+
+def _query(value: int) -> pl.DataFrame:
+    return pl.LazyFrame({"value": [value]}).select(pl.col("value") * 2).collect()
+
+
+def _nodes(barrier):
+    """Two independent nodes, which run concurrently if given a barrier"""
+
+    def _wait():
+        if barrier is not None:
+            barrier.wait(timeout=10)
+
+    def lazy_partitions():
+        _wait()
+        _query(1)
+        _wait()
+
+        def _partition():
+            time.sleep(LAZY_SAVE_SECONDS)
+            return _query(2)
+
+        return {"part": _partition}
+
+    def eager():
+        _wait()
+        df = _query(3)
+        _wait()
+        return df
+
+    return pipeline(
+        [
+            node(lazy_partitions, None, "partitions", name="lazy_node"),
+            node(eager, None, "eager_output", name="eager_node"),
+        ]
+    )
+
+
+def _run(runner, barrier, tmp_path):
+    catalog = DataCatalog(
+        {
+            "partitions": PartitionedDataSet(
+                path=str(tmp_path / "partitions"),
+                dataset=(
+                    "udacity_de_capstone.extras.datasets.parquet_dataset.ParquetDataSet"
+                ),
+                filename_suffix=".parquet",
+            ),
+            "eager_output": MemoryDataSet(),
+            "params:profiling": MemoryDataSet(
+                {
+                    "enabled": True,
+                    "output_dir": str(tmp_path / "profiles"),
+                    "sample_interval_ms": 5,
+                    "top_operators": 5,
+                }
+            ),
+        }
+    )
+    hooks = ProfilingHooks()
+    hook_manager = _create_hook_manager()
+    hook_manager.register(hooks)
+    pipe = _nodes(barrier)
+    hooks.before_pipeline_run({"session_id": "run"}, pipe, catalog)
+    runner.run(pipe, catalog, hook_manager)
+    hooks.after_pipeline_run()
+    return tmp_path / "profiles" / "run"
+
+
+def _node_durations(summary: str) -> dict:
+    lines = summary.split("\n\n")[0].splitlines()[1:]
+    return {line.split()[1]: float(line.split()[0]) for line in lines}
+
+
+@pytest.mark.parametrize(
+    "runner,barrier",
+    [
+        (SequentialRunner(), None),
+        (ThreadRunner(max_workers=2), threading.Barrier(2)),
+    ],
+    ids=["sequential", "thread"],
+)
+def test_queries_attributed_to_nodes(runner, barrier, tmp_path):
+    profile_dir = _run(runner, barrier, tmp_path)
+
+    plans = sorted(path.stem for path in (profile_dir / "plans").iterdir())
+    # the lazy partition is computed while the node's output is saved
+    assert plans == ["eager_node__001", "lazy_node__001", "lazy_node__002"]
+    assert '"value"' in (profile_dir / "plans" / "lazy_node__002.txt").read_text()
+
+    with open(profile_dir / "operators.csv", newline="") as file:
+        operators = list(csv.DictReader(file))
+    assert operators
+    assert {(row["node"], row["query"].split("__")[0]) for row in operators} == {
+        ("lazy_node", "lazy_node"),
+        ("eager_node", "eager_node"),
+    }
+    assert NO_NODE not in {row["node"] for row in operators}
+
+    durations = _node_durations((profile_dir / "summary.txt").read_text())
+    assert set(durations) == {"lazy_node", "eager_node"}
+    assert durations["lazy_node"] >= LAZY_SAVE_SECONDS
+    assert durations["eager_node"] < LAZY_SAVE_SECONDS
+    assert pl.read_parquet(tmp_path / "partitions" / "part.parquet").item() == 4
+
+
+def test_worker_threads_keep_the_node(tmp_path):
+    profiler = QueryProfiler(tmp_path, sample_interval=0.005, top_operators=5)
+    profiler.start()
+    try:
+        profiler.node_started("parent")
+        with ThreadPoolExecutor(2) as executor:
+            nodes = list(
+                map_in_context(executor, lambda _: profiler.current_node, range(4))
+            )
+            unpropagated = executor.submit(lambda: profiler.current_node).result()
+        profiler.exit_node("parent")
+    finally:
+        profiler.stop()
+    assert nodes == ["parent"] * 4
+    assert unpropagated == NO_NODE
+    assert profiler.current_node == NO_NODE
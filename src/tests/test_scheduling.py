@@ -0,0 +1,141 @@
+import json
+
+import pytest
+
+from udacity_de_capstone import scheduling
+from udacity_de_capstone.scheduling import (
+    GB,
+    pack_batches,
+    pack_batches_in_order,
+    run_partitions,
+    run_partitions_lazily,
+)
+
+
+@pytest.fixture
+def params(tmp_path):
+    # a budget of 100 bytes, with partition sizes in bytes below
+    return {
+        "memory_budget_gb": 100 / GB,
+        "max_workers": 2,
+        "default_memory_factor": 1.0,
+        "history_dir": str(tmp_path / "history"),
+    }
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Records the partitions of every batch run by the scheduler"""
+    recorded = []
+    run_batch = scheduling._Scheduler.run_batch
+
+    def _run_batch(self, i, batch):
+        recorded.append(list(batch))
+        return run_batch(self, i, batch)
+
+    monkeypatch.setattr(scheduling._Scheduler, "run_batch", _run_batch)
+    return recorded
+
+
+def _partitions(ids):
+    return {p: (lambda p=p: p.upper()) for p in ids}
+
+
+class TestPackBatches:
+    def test_first_fit_decreasing(self):
+        costs = {"a": 50, "b": 30, "c": 60, "d": 20, "e": 40}
+        assert pack_batches(costs, 100) == [["c", "e"], ["a", "b", "d"]]
+
+    def test_batches_within_budget(self):
+        costs = {f"p{i}": (i * 37) % 90 + 1 for i in range(50)}
+        batches = pack_batches(costs, 100)
+        assert sorted(p for batch in batches for p in batch) == sorted(costs)
+        assert all(sum(costs[p] for p in batch) <= 100 for batch in batches)
+
+    def test_over_budget(self):
+        assert pack_batches({"a": 150, "b": 10, "c": 95}, 100) == [
+            ["a"],
+            ["c"],
+            ["b"],
+        ]
+
+    def test_zero_budget(self):
+        assert pack_batches({"a": 1, "b": 2}, 0) == [["b"], ["a"]]
+
+    def test_empty(self):
+        assert pack_batches({}, 100) == []
+
+
+class TestPackBatchesInOrder:
+    def test_consecutive(self):
+        costs = {"a": 50, "b": 30, "c": 60, "d": 20, "e": 40}
+        assert pack_batches_in_order(costs, 100) == [["a", "b"], ["c", "d"], ["e"]]
+
+    def test_over_budget(self):
+        costs = {"a": 10, "b": 150, "c": 10}
+        assert pack_batches_in_order(costs, 100) == [["a"], ["b"], ["c"]]
+
+
+class TestRunPartitions:
+    def test_results_in_partition_order(self, params, batches):
+        ids = ["2021-01", "2021-02", "2021-03", "2021-04"]
+        sizes = {"2021-01": 10, "2021-02": 60, "2021-03": 30, "2021-04": 50}
+        results = run_partitions(
+            "stage", lambda p, data: (p, data), _partitions(ids), sizes, params, len
+        )
+        assert list(results) == ids
+        assert results["2021-03"] == ("2021-03", "2021-03".upper())
+        assert sorted(p for batch in batches for p in batch) == ids
+
+    @pytest.mark.parametrize(
+        "result_size,expected",
+        [(0, [["a", "b"], ["c", "d"]]), (30, [["a", "b"], ["c"], ["d"]])],
+    )
+    def test_retained_results_count_against_budget(
+        self, params, batches, result_size, expected
+    ):
+        sizes = {"a": 40, "b": 40, "c": 40, "d": 40}
+        run_partitions(
+            "stage",
+            lambda p, data: data,
+            _partitions(sizes),
+            sizes,
+            params,
+            lambda result: result_size,
+        )
+        assert batches == expected
+
+    def test_memory_factors_are_recorded(self, params, tmp_path):
+        sizes = {"a": 40, "b": 40}
+        run_partitions(
+            "stage", lambda p, data: data, _partitions(sizes), sizes, params, len
+        )
+        with open(tmp_path / "history" / "stage.json", encoding="utf-8") as file:
+            factors = json.load(file)
+        assert sorted(factors) == ["a", "b"]
+        assert all(
+            factor >= params["default_memory_factor"] for factor in factors.values()
+        )
+
+
+class TestRunPartitionsLazily:
+    def test_batches_run_on_request(self, params, batches):
+        sizes = {"a": 40, "b": 40, "c": 40}
+        calls = []
+
+        def _func(partition_id, data):
+            calls.append(partition_id)
+            return data
+
+        results = run_partitions_lazily(
+            "stage", _func, _partitions(sizes), sizes, params
+        )
+        assert list(results) == ["a", "b", "c"]
+        assert calls == []
+
+        assert results["a"]() == "A"
+        assert sorted(calls) == ["a", "b"]
+        assert results["b"]() == "B"
+        assert sorted(calls) == ["a", "b"]
+        assert results["c"]() == "C"
+        assert batches == [["a", "b"], ["c"]]
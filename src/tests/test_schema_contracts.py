@@ -0,0 +1,107 @@
+import json
+from types import SimpleNamespace
+
+import polars as pl
+import pytest
+
+from udacity_de_capstone.hooks import SchemaContractHooks
+from udacity_de_capstone.schema_contracts import (
+    DATA_DICTIONARY_DIR,
+    SCHEMA_CONTRACTS,
+    PlannedPartition,
+    enforce_contract,
+    schema_to_dict,
+)
+
+CONTRACT = {"fl_date": "Date", "tail_num": "Utf8", "dep_delay": "Int64"}
+
+
+def _frame(**overrides) -> pl.DataFrame:
+    columns = {
+        "fl_date": pl.Series([None], dtype=pl.Date),
+        "tail_num": pl.Series(["N1"]),
+        "dep_delay": pl.Series([3]),
+        **overrides,
+    }
+    return pl.DataFrame({k: v for k, v in columns.items() if v is not None})
+
+
+@pytest.fixture
+def hooks(tmp_path) -> SchemaContractHooks:
+    """Hooks of a project whose data dictionary holds `CONTRACT` for every dataset"""
+    directory = tmp_path / DATA_DICTIONARY_DIR
+    directory.mkdir(parents=True)
+    for entry in SCHEMA_CONTRACTS.values():
+        (directory / f"{entry}.json").write_text(json.dumps(CONTRACT))
+
+    hooks = SchemaContractHooks()
+    hooks.after_context_created(SimpleNamespace(project_path=tmp_path))
+    return hooks
+
+
+def test_schema_to_dict():
+    assert schema_to_dict(_frame().schema) == CONTRACT
+
+
+def test_passing_contract(hooks):
+    # column order is not part of the contract
+    hooks.before_dataset_saved("state_stats", _frame().reverse(), None)
+    hooks.before_dataset_saved("combined_all", {"combined_2022_01": _frame()}, None)
+
+
+def test_missing_column(hooks):
+    with pytest.raises(ValueError, match="state_stats violated: missing column 'dep"):
+        hooks.before_dataset_saved("state_stats", _frame(dep_delay=None), None)
+
+
+def test_dtype_mismatch(hooks):
+    df = _frame(dep_delay=pl.Series([3.0]), extra=pl.Series([1]))
+    with pytest.raises(ValueError) as err:
+        hooks.before_dataset_saved("combined_all", {"combined_2022_01": df}, None)
+    assert str(err.value) == (
+        "Schema contract of combined_all/combined_2022_01 violated: "
+        "unexpected column 'extra' (Int64); column 'dep_delay' is Float64, "
+        "expected Int64"
+    )
+
+
+def test_datasets_without_contract(hooks):
+    hooks.before_dataset_saved("flights_validated", {"x": _frame(tail_num=None)}, None)
+
+
+def test_lazy_partitions_are_checked_when_computed():
+    loads = []
+
+    def _load(df):
+        loads.append(df)
+        return df
+
+    data = {
+        "ok": lambda: _load(_frame()),
+        "drifted": lambda: _load(_frame(fl_date=pl.Series(["2022-01-01"]))),
+    }
+    enforce_contract("combined_all", CONTRACT, data)
+    assert not loads
+    assert data["ok"]().frame_equal(_frame())
+    with pytest.raises(ValueError, match="'fl_date' is Utf8, expected Date"):
+        data["drifted"]()
+
+
+def test_planned_partitions_are_checked_before_computed():
+    def _compute():
+        raise AssertionError("should not be computed")
+
+    ok = PlannedPartition(lambda: _frame(), _frame().lazy().schema)
+    drifted = PlannedPartition(_compute, _frame().lazy().drop("tail_num").schema)
+    data = {"combined_2022_01": ok, "combined_2022_02": drifted}
+    with pytest.raises(ValueError, match="combined_2022_02 violated: missing column"):
+        enforce_contract("combined_all", CONTRACT, data)
+
+    # partitions whose plan passes are still checked once computed
+    planned = PlannedPartition(
+        lambda: _frame(dep_delay=pl.Series(["late"])), _frame().schema
+    )
+    data = {"combined_2022_03": planned}
+    enforce_contract("combined_all", CONTRACT, data)
+    with pytest.raises(ValueError, match="'dep_delay' is Utf8"):
+        data["combined_2022_03"]()
@@ -0,0 +1,62 @@
+"""
+Startup time benchmark for the project package.
+
+Kedro configures the project (settings and hooks), imports the pipeline registry
+and builds all pipelines for every CLI call (e.g., ``kedro run --tags population``
+or ``kedro catalog list``), so this has to stay cheap. Heavy dependencies must only
+be imported once a node actually runs.
+"""
+
+import json
+import subprocess
+import sys
+
+# import time budget of the project package itself, on top of Kedro's own imports
+IMPORT_TIME_BUDGET_SECONDS = 0.25
+
+HEAVY_DEPENDENCIES = ("polars", "requests")
+
+_BENCHMARK_SCRIPT = """
+import json, sys, time
+# Kedro's own imports, e.g. the CLI always imports the session
+import kedro.framework.project, kedro.framework.session, kedro.pipeline
+from kedro.framework.project import configure_project, pipelines, settings
+
+# the path of every Kedro command: project settings (with hooks), then pipelines
+start = time.perf_counter()
+configure_project("udacity_de_capstone")
+settings.HOOKS
+pipelines["__default__"]
+elapsed = time.perf_counter() - start
+
+# lazily imported modules are registered, but not executed until first use;
+# a registered module executed since (e.g. by inspecting it) is a plain module
+loaded = [
+    name for name in sys.argv[1:] if type(sys.modules.get(name)).__name__ == "module"
+]
+print(json.dumps({"elapsed": elapsed, "loaded": loaded}))
+"""
+
+
+def _run_benchmark() -> dict:
+    # run in a fresh interpreter, so that no module is already cached
+    output = subprocess.run(
+        [sys.executable, "-c", _BENCHMARK_SCRIPT, *HEAVY_DEPENDENCIES],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+class TestStartup:
+    def test_heavy_dependencies_are_not_loaded(self):
+        assert _run_benchmark()["loaded"] == []
+
+    def test_import_time_budget(self):
+        # best of three, to smooth out noise of cold filesystem caches
+        elapsed = min(_run_benchmark()["elapsed"] for _ in range(3))
+        assert elapsed < IMPORT_TIME_BUDGET_SECONDS, (
+            f"Building the pipelines took {elapsed:.3f}s,"
+            f" budget is {IMPORT_TIME_BUDGET_SECONDS:.3f}s"
+        )
@@ -0,0 +1,159 @@
+"""
+Streaming parser for US Census API responses.
+
+The Census API returns an array of arrays in JSON format, where the first
+array is the header and all other ones are data rows, with every value as a string.
+Instead of loading the whole document into Python lists, rows are decoded one by one
+and buffered per column. Every `batch_size` rows, the buffers are turned into a typed
+polars DataFrame, so type casts are applied while parsing, and the Python objects held
+at any time are bounded by the batch size rather than the size of the response
+(e.g., county level data). This only holds for streamed responses (see
+``StreamingAPIDataSet``): otherwise, the whole body is downloaded before parsing.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+from udacity_de_capstone.utils import lazy_import
+
+if TYPE_CHECKING:
+    import polars as pl
+    import requests
+else:
+    pl = lazy_import("polars")
+
+DEFAULT_BATCH_SIZE = 100_000
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+class _ColumnBuffers:
+    """Per column buffers, flushed into typed DataFrames batch by batch"""
+
+    def __init__(
+        self,
+        header: List[str],
+        dtypes: Dict[str, pl.PolarsDataType],
+        date_formats: Dict[str, str],
+    ) -> None:
+        unknown = (set(dtypes) | set(date_formats)) - set(header)
+        if unknown:
+            raise ValueError(f"Columns {sorted(unknown)} not found in {header}")
+
+        self.header = header
+        self.casts = [
+            pl.col(name).str.to_date(fmt) for name, fmt in date_formats.items()
+        ] + [pl.col(name).cast(dtype) for name, dtype in dtypes.items()]
+        self.values: List[List[Optional[str]]] = [[] for _ in header]
+        self.batches: List[pl.DataFrame] = []
+
+    def __len__(self) -> int:
+        return len(self.values[0])
+
+    def append(self, row: List[Optional[str]]) -> None:
+        if len(row) != len(self.header):
+            raise ValueError(
+                f"Expected {len(self.header)} values per row. Found {len(row)}: {row}"
+            )
+        for column, value in zip(self.values, row):
+            column.append(value)
+
+    def flush(self) -> None:
+        batch = pl.DataFrame(
+            dict(zip(self.header, self.values)),
+            schema={name: pl.Utf8 for name in self.header},
+        )
+        self.batches.append(batch.with_columns(self.casts))
+        self.values = [[] for _ in self.header]
+
+    def to_frame(self) -> pl.DataFrame:
+        if len(self) or not self.batches:
+            self.flush()
+        return pl.concat(self.batches, rechunk=True)
+
+
+def parse_census_json(
+    chunks: Iterable[bytes],
+    dtypes: Optional[Dict[str, pl.PolarsDataType]] = None,
+    date_formats: Optional[Dict[str, str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> pl.DataFrame:
+    """Parses a Census API array of arrays JSON document into a polars DataFrame.
+
+    Args:
+        chunks: raw bytes of the document, e.g. ``response.iter_content(...)``
+        dtypes: data types to cast columns to; all other columns are kept as strings
+        date_formats: `strftime` formats of columns to be parsed as dates
+        batch_size: number of rows to buffer before converting them to columns
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+
+    buffers: Optional[_ColumnBuffers] = None
+    text = ""
+    pos = 0
+    started = finished = False
+
+    for chunk in chunks:
+        text = text[pos:] + text_decoder.decode(chunk)
+        pos = 0
+        while not finished:
+            # skip separators between rows
+            while pos < len(text) and text[pos] in _WHITESPACE + ",":
+                pos += 1
+            if pos == len(text):
+                break
+
+            if not started:
+                if text[pos] != "[":
+                    raise ValueError("Census response is not a JSON array")
+                started = True
+                pos += 1
+                continue
+            if text[pos] == "]":
+                finished = True
+                break
+
+            try:
+                row, end = decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                # incomplete row, wait for the next chunk
+                break
+            pos = end
+
+            if buffers is None:
+                buffers = _ColumnBuffers(row, dtypes or {}, date_formats or {})
+                continue
+            buffers.append(row)
+            if len(buffers) >= batch_size:
+                buffers.flush()
+
+    if not finished:
+        raise ValueError("Census response ended before the closing bracket")
+    if buffers is None:
+        raise ValueError("Census response has no header")
+    return buffers.to_frame()
+
+
+def parse_census_response(
+    response: requests.Response,
+    dtypes: Optional[Dict[str, pl.PolarsDataType]] = None,
+    date_formats: Optional[Dict[str, str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> pl.DataFrame:
+    """Parses a Census API response, see ``parse_census_json`` for details.
+    The response is closed afterwards, e.g. releasing the connection of a stream.
+    """
+    with response:
+        response.raise_for_status()
+        return parse_census_json(
+            response.iter_content(chunk_size=chunk_size),
+            dtypes=dtypes,
+            date_formats=date_formats,
+            batch_size=batch_size,
+        )
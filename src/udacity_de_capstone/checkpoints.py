@@ -0,0 +1,70 @@
+"""
+Checkpoint manifests of resumable stages.
+
+A manifest is a small JSON document listing the source files a stage has
+completely processed, together with their fingerprint (size and modification time)
+and the output files written for them. It also holds the settings of the stage
+(e.g. parameters the outputs depend on), so that outputs are only reused
+if they were produced the same way.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+Manifest = Dict[str, Any]
+
+
+def new_manifest(settings: Dict[str, Any]) -> Manifest:
+    return {"settings": _to_json(settings), "files": {}}
+
+
+def load_manifest(path: Path) -> Optional[Manifest]:
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_manifest(path: Path, manifest: Manifest) -> None:
+    """Saves the manifest atomically, so that an interruption cannot corrupt it"""
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=4, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def matches_settings(manifest: Manifest, settings: Dict[str, Any]) -> bool:
+    return manifest["settings"] == _to_json(settings)
+
+
+def file_fingerprint(path: str) -> Dict[str, int]:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def is_completed(manifest: Manifest, path: str, output_dir: Path) -> bool:
+    """Whether a source file was processed in its current state,
+    and all its outputs (relative to `output_dir`) still exist
+    """
+    entry = manifest["files"].get(path)
+    return (
+        entry is not None
+        and entry["fingerprint"] == file_fingerprint(path)
+        and all((output_dir / output).exists() for output in entry["outputs"])
+    )
+
+
+def mark_completed(manifest: Manifest, path: str, outputs: list) -> None:
+    manifest["files"][path] = {
+        "fingerprint": file_fingerprint(path),
+        "outputs": sorted(outputs),
+    }
+
+
+def _to_json(value: Any) -> Any:
+    """Normalizes a value to what it looks like after a JSON round trip"""
+    return json.loads(json.dumps(value, default=str, sort_keys=True))
@@ -0,0 +1 @@
+"""Project specific extensions of Kedro."""
@@ -0,0 +1 @@
+"""Custom datasets of the project."""
@@ -0,0 +1,109 @@
+"""``CSVSourceDataSet`` loads a handle to one or more CSV files instead of their
+contents, so that nodes can decide whether to read them fully, lazily, or in chunks.
+"""
+
+from __future__ import annotations
+
+import glob
+from copy import deepcopy
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List
+
+from kedro.io.core import AbstractDataSet, DataSetError
+
+from udacity_de_capstone.utils import lazy_import
+
+if TYPE_CHECKING:
+    import polars as pl
+else:
+    pl = lazy_import("polars")
+
+
+@dataclass(frozen=True)
+class CSVSource:
+    """Handle to CSV files matching a path or glob pattern,
+    with the arguments used for reading them.
+
+    All files are read with the same schema, inferred from the first one
+    (unless set with ``load_args["dtypes"]``), so that they can be combined.
+    """
+
+    filepath: str
+    load_args: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def files(self) -> List[str]:
+        """Matching files, in sorted order"""
+        return sorted(glob.glob(self.filepath))
+
+    def file_source(self, path: str) -> CSVSource:
+        """Handle to a single matching file, read with the schema of all files"""
+        return CSVSource(path, self._file_load_args())
+
+    @property
+    def dtypes(self) -> Dict[str, pl.PolarsDataType]:
+        """Data types all files are read with"""
+        return self._file_load_args()["dtypes"]
+
+    def _file_load_args(self) -> Dict[str, Any]:
+        if "dtypes" in self.load_args:
+            return self.load_args
+        files = self.files
+        if not files:
+            raise FileNotFoundError(f"No files matching {self.filepath}")
+        schema = pl.scan_csv(files[0], **self.load_args).schema
+        return {**self.load_args, "dtypes": schema}
+
+    def read(self) -> pl.DataFrame:
+        """Reads all files into memory"""
+        load_args = self._file_load_args()
+        return pl.concat([pl.read_csv(path, **load_args) for path in self.files])
+
+    def scan(self) -> pl.LazyFrame:
+        """Lazily scans all files, e.g. for pushing down filters and projections"""
+        load_args = self._file_load_args()
+        return pl.concat([pl.scan_csv(path, **load_args) for path in self.files])
+
+    def iter_batches(self, batch_rows: int) -> Iterator[pl.DataFrame]:
+        """Reads all files, one after another, in batches of about `batch_rows` rows"""
+        load_args = self._file_load_args()
+        for path in self.files:
+            reader = pl.read_csv_batched(path, batch_size=batch_rows, **load_args)
+            while True:
+                batches = reader.next_batches(1)
+                if not batches:
+                    break
+                yield from batches
+
+
+class CSVSourceDataSet(AbstractDataSet[None, CSVSource]):
+    """Loads a ``CSVSource`` pointing to local CSV files. Read only.
+    The file path can be a glob pattern, e.g. for yearly or monthly files.
+
+    Example catalog entry:
+
+    .. code-block:: yaml
+
+        raw_flights:
+          type: udacity_de_capstone.extras.datasets.csv_source.CSVSourceDataSet
+          filepath: data/01_raw/flights/CompleteData*.csv
+          load_args:
+            separator: ","
+    """
+
+    def __init__(self, filepath: str, load_args: Dict[str, Any] = None) -> None:
+        self._filepath = PurePosixPath(filepath)
+        self._load_args = deepcopy(load_args) or {}
+
+    def _load(self) -> CSVSource:
+        return CSVSource(str(self._filepath), deepcopy(self._load_args))
+
+    def _save(self, data: None) -> None:
+        raise DataSetError(f"{self.__class__.__name__} is read only")
+
+    def _exists(self) -> bool:
+        return bool(glob.glob(str(self._filepath)))
+
+    def _describe(self) -> Dict[str, Any]:
+        return {"filepath": self._filepath, "load_args": self._load_args}
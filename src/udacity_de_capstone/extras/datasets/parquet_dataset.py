@@ -0,0 +1,64 @@
+"""``ParquetDataSet`` loads / saves polars DataFrames from / to Parquet files,
+using the native polars reader and writer.
+"""
+
+from __future__ import annotations
+
+from copy import deepcopy
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Any, Dict
+
+from kedro.io.core import AbstractDataSet
+
+from udacity_de_capstone.utils import lazy_import
+
+if TYPE_CHECKING:
+    import polars as pl
+else:
+    pl = lazy_import("polars")
+
+
+class ParquetDataSet(AbstractDataSet["pl.DataFrame", "pl.DataFrame"]):
+    """Loads / saves a polars DataFrame from / to a local Parquet file.
+
+    Example catalog entry:
+
+    .. code-block:: yaml
+
+        hourly_airport_delays:
+          type: udacity_de_capstone.extras.datasets.parquet_dataset.ParquetDataSet
+          filepath: data/08_reporting/hourly_airport_delays.parquet
+          save_args:
+            compression: zstd
+            statistics: true
+    """
+
+    DEFAULT_SAVE_ARGS: Dict[str, Any] = {"compression": "zstd"}
+
+    def __init__(
+        self,
+        filepath: str,
+        load_args: Dict[str, Any] = None,
+        save_args: Dict[str, Any] = None,
+    ) -> None:
+        self._filepath = PurePosixPath(filepath)
+        self._load_args = deepcopy(load_args) or {}
+        self._save_args = {**self.DEFAULT_SAVE_ARGS, **(save_args or {})}
+
+    def _load(self) -> pl.DataFrame:
+        return pl.read_parquet(str(self._filepath), **self._load_args)
+
+    def _save(self, data: pl.DataFrame) -> None:
+        path = Path(self._filepath)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data.write_parquet(path, **self._save_args)
+
+    def _exists(self) -> bool:
+        return Path(self._filepath).exists()
+
+    def _describe(self) -> Dict[str, Any]:
+        return {
+            "filepath": self._filepath,
+            "load_args": self._load_args,
+            "save_args": self._save_args,
+        }
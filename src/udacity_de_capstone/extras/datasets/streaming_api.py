@@ -0,0 +1,48 @@
+"""``StreamingAPIDataSet`` loads a streamed response from an HTTP(S) API,
+whose body is only downloaded while it is being consumed.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import requests
+from kedro.io.core import DataSetError
+from kedro_datasets.api import APIDataSet
+
+
+class StreamingAPIDataSet(APIDataSet):
+    """Same as ``api.APIDataSet``, except that the request is made with
+    ``stream=True``: the loaded response holds no body yet, which is read
+    chunk by chunk with e.g. ``response.iter_content()``.
+    The response should therefore be consumed (or closed) by the node loading it.
+
+    Example catalog entry:
+
+    .. code-block:: yaml
+
+        raw_county_population:
+          type: udacity_de_capstone.extras.datasets.streaming_api.StreamingAPIDataSet
+          url: http://api.census.gov/data/2021/pep/population
+          params:
+            get: "NAME,LASTUPDATE,STATE,COUNTY,POP_2021"
+            for: "county:*"
+    """
+
+    def _execute_request(self) -> requests.Response:
+        try:
+            response = requests.request(**self._request_args, stream=True)
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as exc:
+            raise DataSetError("Failed to fetch data", exc) from exc
+        except OSError as exc:
+            raise DataSetError("Failed to connect to the remote server") from exc
+        return response
+
+    def _exists(self) -> bool:
+        # only the headers are downloaded
+        with self._execute_request() as response:
+            return response.ok
+
+    def _describe(self) -> Dict[str, Any]:
+        return {**super()._describe(), "stream": True}
@@ -0,0 +1,104 @@
+"""Project hooks."""
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from kedro.framework.context import KedroContext
+from kedro.framework.hooks import hook_impl
+from kedro.io import DataCatalog
+from kedro.pipeline import Pipeline
+from kedro.pipeline.node import Node
+
+from udacity_de_capstone.schema_contracts import (
+    DATA_DICTIONARY_DIR,
+    Schema,
+    enforce_contract,
+    load_contracts,
+)
+
+if TYPE_CHECKING:
+    from udacity_de_capstone.profiling import QueryProfiler
+
+
+class SchemaContractHooks:
+    """Checks output datasets against their schema in the data dictionary
+    before they are saved
+    """
+
+    def __init__(self) -> None:
+        self._contracts: Dict[str, Schema] = {}
+
+    @hook_impl
+    def after_context_created(self, context: KedroContext) -> None:
+        self._contracts = load_contracts(context.project_path / DATA_DICTIONARY_DIR)
+
+    @hook_impl
+    def before_dataset_saved(self, dataset_name: str, data: Any, node: Node) -> None:
+        if dataset_name in self._contracts:
+            enforce_contract(dataset_name, self._contracts[dataset_name], data)
+
+
+class ProfilingHooks:
+    """Profiles runs with ``params:profiling`` enabled, see ``profiling.py``.
+
+    Example:
+        kedro run --params profiling.enabled:true
+    """
+
+    def __init__(self) -> None:
+        self._profiler: Optional["QueryProfiler"] = None
+
+    @hook_impl
+    def before_pipeline_run(
+        self, run_params: Dict[str, Any], pipeline: Pipeline, catalog: DataCatalog
+    ) -> None:
+        params = catalog.load("params:profiling")
+        if not params["enabled"]:
+            return
+        # only imported when profiling, as the profiler registers polars,
+        # which the startup of every Kedro command would otherwise import
+        from udacity_de_capstone.profiling import QueryProfiler
+
+        self._profiler = QueryProfiler(
+            Path(params["output_dir"]) / run_params["session_id"],
+            sample_interval=params["sample_interval_ms"] / 1000,
+            top_operators=params["top_operators"],
+        )
+        self._profiler.start()
+
+    @hook_impl
+    def before_node_run(self, node: Node) -> None:
+        if self._profiler is not None:
+            self._profiler.node_started(node.name)
+
+    @hook_impl
+    def after_node_run(self, node: Node) -> None:
+        if self._profiler is not None:
+            self._profiler.exit_node(node.name)
+
+    @hook_impl
+    def on_node_error(self, node: Node) -> None:
+        self.after_node_run(node)
+
+    # outputs returned as callables (e.g., partitions) are computed when saved
+    @hook_impl
+    def before_dataset_saved(self, dataset_name: str, data: Any, node: Node) -> None:
+        if self._profiler is not None:
+            self._profiler.enter_node(node.name)
+
+    @hook_impl
+    def after_dataset_saved(self, dataset_name: str, data: Any, node: Node) -> None:
+        if self._profiler is not None:
+            self._profiler.exit_node(node.name)
+
+    @hook_impl
+    def after_pipeline_run(self) -> None:
+        self._stop()
+
+    @hook_impl
+    def on_pipeline_error(self) -> None:
+        self._stop()
+
+    def _stop(self) -> None:
+        if self._profiler is not None:
+            self._profiler.stop()
+            self._profiler = None
@@ -0,0 +1,112 @@
+"""
+Compact metadata sidecars for partitioned datasets.
+
+Every partition writer emits a small JSON document next to the data
+holding the row count, duplicate count, in-memory size, and per-column
+null counts, min / max values, and distinct count estimates.
+Checks and logging can then use these instead of re-reading the partitions.
+"""
+
+from __future__ import annotations
+
+import ast
+import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, Mapping, Union
+
+from udacity_de_capstone.utils import lazy_import
+
+if TYPE_CHECKING:
+    import polars as pl
+else:
+    pl = lazy_import("polars")
+
+PartitionStats = Dict[str, Any]
+
+
+def _to_json_value(value: Any) -> Any:
+    """Converts polars scalars into values that can be stored in JSON"""
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    return value
+
+
+def compute_partition_stats(df: pl.DataFrame) -> PartitionStats:
+    """Computes the metadata sidecar of a single partition.
+
+    All column statistics are computed in a single pass of the query engine.
+    Min / max values are only kept for numeric, temporal, and boolean columns.
+    """
+    ranged_cols = [
+        name
+        for name, dtype in df.schema.items()
+        if dtype in pl.NUMERIC_DTYPES
+        or dtype in pl.TEMPORAL_DTYPES
+        or dtype == pl.Boolean
+    ]
+    summary = df.select(
+        [pl.col(c).null_count().alias(f"{c}__null_count") for c in df.columns]
+        + [pl.col(c).approx_unique().alias(f"{c}__n_unique") for c in df.columns]
+        + [pl.col(c).min().alias(f"{c}__min") for c in ranged_cols]
+        + [pl.col(c).max().alias(f"{c}__max") for c in ranged_cols]
+    ).row(0, named=True)
+
+    columns: Dict[str, Dict[str, Any]] = {}
+    for name, dtype in df.schema.items():
+        columns[name] = {
+            "dtype": str(dtype),
+            "null_count": summary[f"{name}__null_count"],
+            "n_unique": summary[f"{name}__n_unique"],
+        }
+        if name in ranged_cols:
+            columns[name]["min"] = _to_json_value(summary[f"{name}__min"])
+            columns[name]["max"] = _to_json_value(summary[f"{name}__max"])
+
+    return {
+        "row_count": df.height,
+        "duplicate_row_count": int(df.is_duplicated().sum()),
+        "estimated_size": int(df.estimated_size()),
+        "columns": columns,
+    }
+
+
+def _parse_dtype(node: ast.expr) -> pl.PolarsDataType:
+    if isinstance(node, ast.Name):
+        dtype = getattr(pl, node.id, None)
+        if isinstance(dtype, type) and issubclass(dtype, pl.DataType):
+            return dtype
+    elif isinstance(node, ast.Call):
+        return _parse_dtype(node.func)(
+            *(_parse_dtype(arg) for arg in node.args),
+            **{kw.arg: ast.literal_eval(kw.value) for kw in node.keywords},
+        )
+    raise ValueError(f"Not a polars data type: {ast.unparse(node)}")
+
+
+def partition_schema(stats: PartitionStats) -> Dict[str, pl.PolarsDataType]:
+    """Schema of a partition, as recorded in its sidecar, without loading any data"""
+    return {
+        name: _parse_dtype(ast.parse(col["dtype"], mode="eval").body)
+        for name, col in stats["columns"].items()
+    }
+
+
+def load_partition_stats(
+    stats: Mapping[str, Union[PartitionStats, Callable[[], PartitionStats]]]
+) -> Dict[str, PartitionStats]:
+    """Materialises sidecars coming from a `PartitionedDataSet` (lazy loaders)"""
+    return {
+        partition_id: (load_stats() if callable(load_stats) else load_stats)
+        for partition_id, load_stats in stats.items()
+    }
+
+
+def partition_sizes(stats: Mapping[str, PartitionStats]) -> Dict[str, int]:
+    """In-memory size of each partition in bytes, without loading any data"""
+    return {partition_id: s["estimated_size"] for partition_id, s in stats.items()}
+
+
+def total_row_count(stats: Mapping[str, PartitionStats]) -> int:
+    """Total number of records across all partitions, without loading any data"""
+    return sum(s["row_count"] for s in stats.values())
@@ -1,16 +1,58 @@
 """Project pipelines."""
-from typing import Dict
+import importlib
+import pkgutil
+from typing import Dict, Iterator, Mapping
 
-from kedro.framework.project import find_pipelines
 from kedro.pipeline import Pipeline
 
+import udacity_de_capstone.pipelines
 
-def register_pipelines() -> Dict[str, Pipeline]:
+# pipelines that only run on request, e.g. `kedro run --pipeline data_dictionary`
+_EXCLUDED_FROM_DEFAULT = {"data_dictionary"}
+
+
+class _LazyPipelines(Mapping):
+    """Mapping of pipeline names to pipelines, mirroring ``find_pipelines()``.
+
+    Pipeline names are discovered from the ``pipelines`` subpackages without
+    importing them. A pipeline module is only imported (and its pipeline created)
+    on first access, so that e.g. ``kedro run --pipeline <name>`` does not pay
+    for the modules of all other pipelines.
+    """
+
+    def __init__(self) -> None:
+        self._names = sorted(
+            module.name
+            for module in pkgutil.iter_modules(udacity_de_capstone.pipelines.__path__)
+            if module.ispkg and not module.name.startswith("_")
+        )
+        self._created: Dict[str, Pipeline] = {}
+
+    def _create(self, name: str) -> Pipeline:
+        if name == "__default__":
+            return sum(self[n] for n in self._names if n not in _EXCLUDED_FROM_DEFAULT)
+        module = importlib.import_module(f"udacity_de_capstone.pipelines.{name}")
+        return module.create_pipeline()
+
+    def __getitem__(self, name: str) -> Pipeline:
+        if name not in self._created:
+            if name != "__default__" and name not in self._names:
+                raise KeyError(name)
+            self._created[name] = self._create(name)
+        return self._created[name]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._names
+        yield "__default__"
+
+    def __len__(self) -> int:
+        return len(self._names) + 1
+
+
+def register_pipelines() -> Mapping[str, Pipeline]:
     """Register the project's pipelines.
 
     Returns:
         A mapping from pipeline names to ``Pipeline`` objects.
     """
-    pipelines = find_pipelines()
-    pipelines["__default__"] = sum(pipelines.values())
-    return pipelines
+    return _LazyPipelines()
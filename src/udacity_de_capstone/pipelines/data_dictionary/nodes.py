@@ -0,0 +1,70 @@
+"""
+This is a boilerplate pipeline 'data_dictionary'
+generated using Kedro 0.18.8
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Dict
+
+from udacity_de_capstone.pipelines.data_engineering.nodes import (
+    _airport_lookup,
+    _combine_plan,
+    _departure_airport_plan,
+    _op_carrier_plan,
+    _parse_flights,
+    _route_counts_plan,
+    _state_plan,
+    _with_airport_indices,
+)
+from udacity_de_capstone.schema_contracts import (
+    SCHEMA_CONTRACTS,
+    Schema,
+    schema_to_dict,
+)
+
+if TYPE_CHECKING:
+    import polars as pl
+
+    from udacity_de_capstone.extras.datasets.csv_source import CSVSource
+
+log = logging.getLogger(__name__)
+
+
+def generate_data_dictionary(
+    flights: CSVSource,
+    airports: pl.DataFrame,
+    population: pl.DataFrame,
+    cancellation_codes: pl.DataFrame,
+    weather_codes: pl.DataFrame,
+    carriers: pl.DataFrame,
+) -> Dict[str, Schema]:
+    """Derives the schemas of all output datasets from the lazy plans
+    of the nodes producing them. Plans are never executed:
+    only the schema of the raw flights is inferred from the first rows,
+    and the (small) airport lookup is computed.
+    """
+    combined = _combine_plan(
+        _with_airport_indices(_parse_flights(flights.scan()), airports.lazy()),
+        _airport_lookup(airports, population),
+        cancellation_codes.lazy(),
+        weather_codes.lazy(),
+        carriers.lazy(),
+    )
+    plans = {
+        "combined_all": combined,
+        "operating_carrier_stats": _op_carrier_plan(combined),
+        "state_stats": _state_plan(combined),
+        "departure_airport_stats": _departure_airport_plan(
+            _route_counts_plan(combined)
+        ),
+    }
+
+    data_dictionary = {
+        SCHEMA_CONTRACTS[dataset_name]: schema_to_dict(plan.schema)
+        for dataset_name, plan in plans.items()
+    }
+    for entry, schema in data_dictionary.items():
+        log.info(f"Generated {entry} with {len(schema)} columns")
+    return data_dictionary
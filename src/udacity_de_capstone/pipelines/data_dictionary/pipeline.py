@@ -0,0 +1,29 @@
+"""
+This is a boilerplate pipeline 'data_dictionary'
+generated using Kedro 0.18.8
+"""
+
+from kedro.pipeline import Pipeline, node, pipeline
+
+from .nodes import generate_data_dictionary
+
+
+def create_pipeline(**kwargs) -> Pipeline:
+    return pipeline(
+        [
+            node(
+                func=generate_data_dictionary,
+                inputs=[
+                    "raw_flights",
+                    "airports_validated",
+                    "population_validated",
+                    "raw_cancellation_codes",
+                    "raw_weather_codes",
+                    "raw_carriers",
+                ],
+                outputs="data_dictionary",
+                name="generate_data_dictionary",
+                tags="docs",
+            ),
+        ]
+    )
@@ -3,42 +3,110 @@ This is a boilerplate pipeline 'data_engineering'
 generated using Kedro 0.18.8
 """
 
+from __future__ import annotations
+
+import hashlib
 import logging
-from typing import Callable, Dict, List
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 
-import polars as pl
-import requests
+from udacity_de_capstone.census import parse_census_response
+from udacity_de_capstone.checkpoints import (
+    is_completed,
+    load_manifest,
+    mark_completed,
+    matches_settings,
+    new_manifest,
+    save_manifest,
+)
+from udacity_de_capstone.partition_stats import (
+    PartitionStats,
+    compute_partition_stats,
+    load_partition_stats,
+    partition_schema,
+    partition_sizes,
+    total_row_count,
+)
+from udacity_de_capstone.scheduling import run_partitions, run_partitions_lazily
+from udacity_de_capstone.schema_contracts import PlannedPartition
 from udacity_de_capstone.utils import (
     format_column_names,
+    lazy_import,
+    map_in_context,
     rich_error_wrapper,
     rich_success_wrapper,
 )
 
+# heavy dependencies are only loaded once a node actually runs
+if TYPE_CHECKING:
+    import polars as pl
+    import requests
+
+    from udacity_de_capstone.extras.datasets.csv_source import CSVSource
+else:
+    pl = lazy_import("polars")
+
 log = logging.getLogger(__name__)
 
+# e.g. "December. 21, 2021"
+CENSUS_DATE_FORMAT = r"%B. %d, %Y"
+
+# flights are sampled by the bucket of their flight key hash
+SAMPLE_HASH_BUCKETS = 10_000
+# prime modulus of the flight key hash: products of two residues fit in 64 bits
+_HASH_MODULUS = 2**31 - 1
+_HASH_BASE = 1_000_003
+_HASH_MIXERS = (1_597_334_677, 812_433_253)
+
 
 def _run_generic_dq(df: pl.DataFrame) -> None:
     """Common data quality checks for the project's datasets"""
+    _run_generic_dq_on_stats(compute_partition_stats(df))
+
+
+def _run_generic_dq_on_stats(stats: PartitionStats) -> None:
+    """Common data quality checks, answered from a metadata sidecar only"""
     # check that we have at least one value
-    if df.is_empty():
+    if stats["row_count"] == 0:
         err = "Empty DataFrame!"
         log.error(rich_error_wrapper(err), extra={"markup": True})
         raise ValueError(err)
 
     # check for valid latitudes
-    if not df["latitude"].is_between(-90, 90).all():
+    latitude = stats["columns"]["latitude"]
+    if latitude["min"] is not None and not (
+        -90 <= latitude["min"] and latitude["max"] <= 90
+    ):
         err = "Latitutes outside [-90, 90] degrees range found!"
         log.error(rich_error_wrapper(err), extra={"markup": True})
         raise ValueError(err)
 
     # check for valid longitudes
-    if not df["longitude"].is_between(-180, 180).all():
+    longitude = stats["columns"]["longitude"]
+    if longitude["min"] is not None and not (
+        -180 <= longitude["min"] and longitude["max"] <= 180
+    ):
         err = "Longitudes outside [-180, 180] degrees range found!"
         log.error(rich_error_wrapper(err), extra={"markup": True})
         raise ValueError(err)
 
     # check that we don't have any duplicates
-    if df.is_duplicated().any():
+    if stats["duplicate_row_count"] > 0:
         err = "Duplicate airport entries found!"
         log.error(rich_error_wrapper(err), extra={"markup": True})
         raise ValueError(err)
@@ -49,17 +117,43 @@ def transform_population(response: requests.Response) -> pl.DataFrame:
     Loads population data and
     performs type casts, column cleaning, renaming, and sorting
     """
+    population = parse_census_response(
+        response,
+        dtypes={"POP_2021": pl.Int64},
+        date_formats={"LASTUPDATE": CENSUS_DATE_FORMAT},
+    )
+    population = (
+        population.rename({"POP_2021": "POPULATION", "LASTUPDATE": "LAST_UPDATE_DATE"})
+        .drop("state")
+        .sort("NAME")
+    )
+    population.columns = format_column_names(population.columns)
+    return population
 
-    data = response.json()
-    population = pl.from_records(data[1:], schema=data[0])
+
+def transform_county_population(response: requests.Response) -> pl.DataFrame:
+    """
+    Loads county level population data and
+    performs type casts, column cleaning, renaming, and sorting.
+    County names come as "<county>, <state>" and are split into two columns.
+    FIPS codes are stored as integers, so that they survive CSV round trips.
+    """
+    population = parse_census_response(
+        response,
+        dtypes={"POP_2021": pl.Int64},
+        date_formats={"LASTUPDATE": CENSUS_DATE_FORMAT},
+    )
     population = (
         population.rename({"POP_2021": "POPULATION", "LASTUPDATE": "LAST_UPDATE_DATE"})
         .with_columns(
-            pl.col("LAST_UPDATE_DATE").str.to_date(r"%B. %d, %Y"),
-            pl.col("POPULATION").cast(pl.Int64),
+            pl.col("NAME")
+            .str.split_exact(", ", 1)
+            .struct.rename_fields(["COUNTY_NAME", "STATE_NAME"]),
+            (pl.col("STATE") + pl.col("COUNTY")).cast(pl.Int64).alias("FIPS"),
         )
-        .drop("state")
-        .sort("NAME")
+        .unnest("NAME")
+        .drop("state", "county")
+        .sort("FIPS")
     )
     population.columns = format_column_names(population.columns)
     return population
@@ -91,111 +185,234 @@ def transform_airports(airports: pl.DataFrame) -> pl.DataFrame:
     return df
 
 
+def _airport_index(airports: pl.LazyFrame) -> pl.LazyFrame:
+    """Airports in order of their code, with their dense integer index (row position)"""
+    return (
+        airports.with_columns(pl.col("airport").cast(pl.Utf8))
+        .sort("airport")
+        .with_row_count("airport_index")
+    )
+
+
+def _airport_index_fingerprint(airports: pl.DataFrame) -> Dict[str, Any]:
+    """Number and hash of the airport codes of the index (see ``_airport_index``),
+    recorded in flight sidecars, to check that later lookups use the same index
+    """
+    codes = _airport_index(airports.lazy()).select("airport").collect()["airport"]
+    digest = hashlib.md5("\n".join(codes.to_list()).encode()).hexdigest()
+    return {"count": len(codes), "hash": digest}
+
+
+def _check_airport_index(
+    stats: Mapping[str, PartitionStats], airports: pl.DataFrame
+) -> None:
+    """Raises if flight partitions were indexed with other airports than `airports`"""
+    fingerprint = _airport_index_fingerprint(airports)
+    mismatches = [
+        partition_id
+        for partition_id, partition_stats in stats.items()
+        if partition_stats.get("airport_index") != fingerprint
+    ]
+    if mismatches:
+        err = (
+            f"Airport indices of {mismatches} were assigned with other airports"
+            f" than the current ones ({fingerprint['count']:,} airports)."
+            " Rerun transform_flights to re-index them"
+        )
+        log.error(rich_error_wrapper(err), extra={"markup": True})
+        raise ValueError(err)
+
+
+def _with_airport_indices(
+    flights: pl.LazyFrame, airports: pl.LazyFrame
+) -> pl.LazyFrame:
+    """Adds the indices (see ``_airport_index``) of the origin and destination airports
+    of parsed flights, so that airport attributes can later be gathered by position
+    """
+    index = _airport_index(airports).select("airport", "airport_index")
+    return flights.join(
+        index.rename({"airport": "origin", "airport_index": "origin_airport_index"}),
+        on="origin",
+        how="left",
+    ).join(
+        index.rename(
+            {"airport": "destination", "airport_index": "destination_airport_index"}
+        ),
+        on="destination",
+        how="left",
+    )
+
+
+def _airport_lookup(airports: pl.DataFrame, population: pl.DataFrame) -> pl.DataFrame:
+    """State attributes of airports, where row i holds those of the airport with index i
+    (see ``_airport_index``)
+    """
+    lookup = (
+        _airport_index(airports.lazy())
+        .join(
+            population.lazy().select(
+                pl.col("name").alias("airport_state_name"),
+                pl.col("population").alias("airport_state_population"),
+            ),
+            on="airport_state_name",
+            how="left",
+        )
+        .sort("airport_index")
+        .select("airport_state_name", "airport_state_code", "airport_state_population")
+        .collect()
+    )
+    if lookup.height != airports.height:
+        err = "Population figures are not unique per state. Cannot look up airports"
+        log.error(rich_error_wrapper(err), extra={"markup": True})
+        raise ValueError(err)
+    return lookup
+
+
+def _combine_plan(
+    flights: pl.LazyFrame,
+    airport_lookup: pl.DataFrame,
+    cancellation_codes: pl.LazyFrame,
+    weather_codes: pl.LazyFrame,
+    carriers: pl.LazyFrame,
+) -> pl.LazyFrame:
+    """Lazy plan joining flights with population figures on state level + master data.
+
+    Airport attributes are gathered from `airport_lookup` (see ``_airport_lookup``)
+    by the airport indices of flights, instead of joining on airport codes.
+    """
+    airport_columns = [
+        ("origin", "state_name"),
+        ("origin", "state_code"),
+        ("destination", "state_name"),
+        ("destination", "state_code"),
+        ("origin", "state_population"),
+        ("destination", "state_population"),
+    ]
+    return (
+        flights.with_columns(
+            pl.lit(airport_lookup[f"airport_{attribute}"])
+            .take(pl.col(f"{side}_airport_index"))
+            .alias(f"{side}_{attribute}")
+            for side, attribute in airport_columns
+        )
+        .drop("origin_airport_index", "destination_airport_index")
+        .join(
+            cancellation_codes.rename({"CANCELLATION_REASON": "cancellation_reason"}),
+            left_on="cancelled",
+            right_on="STATUS",
+            how="left",
+        )
+        .join(
+            weather_codes.rename({"WEATHER_DESCRIPTION": "weather_description"}),
+            left_on="active_weather",
+            right_on="STATUS",
+            how="left",
+        )
+        .join(
+            carriers.rename(
+                {"CODE": "mkt_unique_carrier", "DESCRIPTION": "mkt_carrier_name"}
+            ),
+            on="mkt_unique_carrier",
+            how="left",
+        )
+        .join(
+            carriers.rename(
+                {"CODE": "op_unique_carrier", "DESCRIPTION": "op_carrier_name"}
+            ),
+            on="op_unique_carrier",
+            how="left",
+        )
+    )
+
+
 def combine_all_data(
     flights: Dict[str, Callable[[], pl.DataFrame]],
+    flights_stats: Dict[str, Callable[[], PartitionStats]],
     airports: pl.DataFrame,
     population: pl.DataFrame,
     cancellation_codes: pl.DataFrame,
     weather_codes: pl.DataFrame,
     carriers: pl.DataFrame,
-) -> pl.DataFrame:
+    scheduling: Dict[str, Any],
+) -> Tuple[
+    Dict[str, Callable[[], pl.DataFrame]], Dict[str, Callable[[], PartitionStats]]
+]:
     """Enrich the flight data with population figures on state level + master data
     This is simply done to allow for easier analysis later of combined datasets.
+    Also emits the metadata sidecar of each combined partition.
+    Partitions are processed concurrently within the memory budget, while they are
+    saved, so that only one batch of them is held in memory at a time,
+    see ``run_partitions_lazily``. Their planned schema comes along for the
+    schema contract, see ``PlannedPartition``.
     """
-    output: Dict[str, pl.DataFrame] = {}
-    for partition_id, load_flights in flights.items():
+    input_stats = load_partition_stats(flights_stats)
+    _check_airport_index(input_stats, airports)
+    airport_lookup = _airport_lookup(airports, population)
+
+    def _combine_partition(
+        partition_id: str, flight_data: pl.DataFrame
+    ) -> Tuple[pl.DataFrame, PartitionStats]:
         log.info(f"Processing {partition_id=}")
 
-        # load partitioned data
-        flight_data = load_flights()
+        # apply joins and keep only needed columns
+        df = _combine_plan(
+            flight_data.lazy(),
+            airport_lookup,
+            cancellation_codes.lazy(),
+            weather_codes.lazy(),
+            carriers.lazy(),
+        ).collect()
+
+        # check row count post join against the input sidecar
+        stats = compute_partition_stats(df)
+        stats["route_counts"] = _route_counts_plan(df.lazy()).collect().rows()
+        initial_row_count = input_stats[partition_id]["row_count"]
+        post_op_row_count = stats["row_count"]
+        assert (
+            initial_row_count == post_op_row_count
+        ), f"Row count mismatch post join. Expected {initial_row_count:,}. Found {post_op_row_count:,}"
+        return df, stats
+
+    # partitions are combined batch by batch while they are saved, in sorted order
+    results = run_partitions_lazily(
+        "combine_all_data",
+        _combine_partition,
+        {partition_id: flights[partition_id] for partition_id in sorted(flights)},
+        partition_sizes(input_stats),
+        scheduling,
+    )
+
+    # sidecars are kept while saving each partition, to avoid combining it twice
+    combined_stats: Dict[str, PartitionStats] = {}
 
-        # create lazy versions of polars dataframes
-        ldf_airports = airports.lazy()
-        ldf_population = population.lazy()
+    def _combined(partition_id: str) -> pl.DataFrame:
+        df, combined_stats[partition_id] = results[partition_id]()
+        return df
 
+    def _stats(partition_id: str) -> PartitionStats:
+        if partition_id not in combined_stats:
+            _combined(partition_id)
+        return combined_stats.pop(partition_id)
+
+    output: Dict[str, Callable[[], pl.DataFrame]] = {}
+    output_stats: Dict[str, Callable[[], PartitionStats]] = {}
+    for partition_id in results:
         # rename partition for output (kinda ugly...)
         new_partition_id = f"combined{partition_id[partition_id.rfind('_', 0, partition_id.rfind('_')):]}"
-
-        # apply joins and keep only needed columns
-        output[new_partition_id] = (
-            flight_data.lazy()
-            .join(
-                ldf_airports.select(
-                    pl.col("airport"),
-                    pl.col("airport_state_name").alias("origin_state_name"),
-                    pl.col("airport_state_code").alias("origin_state_code"),
-                ),
-                left_on="origin",
-                right_on="airport",
-                how="left",
-            )
-            .join(
-                ldf_airports.select(
-                    pl.col("airport"),
-                    pl.col("airport_state_name").alias("destination_state_name"),
-                    pl.col("airport_state_code").alias("destination_state_code"),
-                ),
-                left_on="destination",
-                right_on="airport",
-                how="left",
-            )
-            .join(
-                ldf_population.select(
-                    pl.col("name").alias("origin_state_name"),
-                    pl.col("population").alias("origin_state_population"),
-                ),
-                on="origin_state_name",
-                how="left",
-            )
-            .join(
-                ldf_population.select(
-                    pl.col("name").alias("destination_state_name"),
-                    pl.col("population").alias("destination_state_population"),
-                ),
-                on="destination_state_name",
-                how="left",
-            )
-            .join(
-                cancellation_codes.lazy().rename(
-                    {"CANCELLATION_REASON": "cancellation_reason"}
-                ),
-                left_on="cancelled",
-                right_on="STATUS",
-                how="left",
-            )
-            .join(
-                weather_codes.lazy().rename(
-                    {"WEATHER_DESCRIPTION": "weather_description"}
-                ),
-                left_on="active_weather",
-                right_on="STATUS",
-                how="left",
-            )
-            .join(
-                carriers.lazy().rename(
-                    {"CODE": "mkt_unique_carrier", "DESCRIPTION": "mkt_carrier_name"}
-                ),
-                on="mkt_unique_carrier",
-                how="left",
-            )
-            .join(
-                carriers.lazy().rename(
-                    {"CODE": "op_unique_carrier", "DESCRIPTION": "op_carrier_name"}
-                ),
-                on="op_unique_carrier",
-                how="left",
-            )
-            .collect()
+        # the schema of each plan can be checked before any partition is combined
+        schema = _combine_plan(
+            pl.DataFrame(schema=partition_schema(input_stats[partition_id])).lazy(),
+            airport_lookup,
+            cancellation_codes.lazy(),
+            weather_codes.lazy(),
+            carriers.lazy(),
+        ).schema
+        output[new_partition_id] = PlannedPartition(
+            partial(_combined, partition_id), schema
         )
+        output_stats[new_partition_id] = partial(_stats, partition_id)
 
-        # check row count post join
-        initial_row_count = flight_data.select(pl.count()).item()
-        post_op_row_count = output[new_partition_id].select(pl.count()).item()
-        assert (
-            initial_row_count == post_op_row_count
-        ), f"Row count mismatch post join. Expected {initial_row_count:,}. Found {post_op_row_count:,}"
-
-    return output
+    return output, output_stats
 
 
 def dq_airports(airports: pl.DataFrame) -> pl.DataFrame:
@@ -219,26 +436,20 @@ def dq_airports(airports: pl.DataFrame) -> pl.DataFrame:
     return airports
 
 
-def transform_flights(flights: pl.DataFrame) -> Dict[str, pl.DataFrame]:
-    """Initial transformation of flight data"""
+def _parse_flights(flights: pl.LazyFrame, categoricals: bool = True) -> pl.LazyFrame:
+    """Type casts, renaming, and column name formatting of raw flight data.
 
-    size_unit = "gb"
-    size_raw = flights.estimated_size(unit=size_unit)
-    log.info(f"Raw flights dataset size: {size_raw:.2f} GB")
-    log.info(f"Records: {flights.shape[0]:,}")
-
-    df = (
-        flights.lazy()
-        .with_columns(
+    Categorical casts can be deferred (see ``_cast_flight_categoricals``),
+    since categories of chunks parsed separately cannot be combined afterwards.
+    """
+    ldf = (
+        flights.with_columns(
             pl.col("FL_DATE").str.to_date(),
             pl.col("MKT_CARRIER_FL_NUM").cast(str).str.zfill(4),
             pl.col("OP_CARRIER_FL_NUM").cast(str).str.zfill(4),
             pl.col("DEP_TIME").str.to_datetime(),
             pl.col("CRS_DEP_TIME").str.to_datetime(),
-            pl.col("MANUFACTURER").cast(pl.Categorical),
-            pl.col("ICAO TYPE").cast(pl.Categorical).alias("ICAO_TYPE"),
-            pl.col("RANGE").cast(pl.Categorical),
-            pl.col("WIDTH").cast(pl.Categorical),
+            pl.col("ICAO TYPE").alias("ICAO_TYPE"),
             pl.col("LOW_LEVEL_CLOUD").cast(pl.Boolean),
             pl.col("MID_LEVEL_CLOUD").cast(pl.Boolean),
             pl.col("HIGH_LEVEL_CLOUD").cast(pl.Boolean),
@@ -246,23 +457,157 @@ def transform_flights(flights: pl.DataFrame) -> Dict[str, pl.DataFrame]:
         )
         .rename({"DEST": "DESTINATION"})
         .drop("ICAO TYPE")
-        .collect()
     )
 
+    # perform column name formatting
+    ldf = ldf.rename(dict(zip(ldf.columns, format_column_names(ldf.columns))))
+    return _cast_flight_categoricals(ldf) if categoricals else ldf
+
+
+def _cast_flight_categoricals(flights: pl.LazyFrame) -> pl.LazyFrame:
+    """Casts low cardinality aircraft columns of parsed flights to categoricals"""
+    return flights.with_columns(
+        pl.col("manufacturer", "icao_type", "range", "width").cast(pl.Categorical)
+    )
+
+
+def _flights_partition_key() -> pl.Expr:
+    """Partitioning column of parsed flights: year and month of the flight"""
+    return pl.col("fl_date").dt.strftime("%Y_%m").alias("year_month")
+
+
+def _flight_key_components() -> List[pl.Expr]:
+    """Raw columns identifying a flight (date, operating carrier, flight number,
+    origin) as non-negative integers. Carrier and airport codes are taken by the
+    bytes of their first 3 characters.
+    """
+
+    def _code(col: str) -> pl.Expr:
+        return (
+            pl.col(col)
+            .cast(pl.Utf8)
+            .str.slice(0, 3)
+            .str.encode("hex")
+            .str.parse_int(16)
+            .cast(pl.Int64)
+        )
+
+    return [
+        # days since 1900-01-01
+        pl.col("FL_DATE").str.to_date().cast(pl.Int64) + 25_567,
+        _code("OP_UNIQUE_CARRIER"),
+        pl.col("OP_CARRIER_FL_NUM").cast(pl.Int64),
+        _code("ORIGIN"),
+    ]
+
+
+def _stable_hash(components: List[pl.Expr], seed: int) -> pl.Expr:
+    """Hash of non-negative integer expressions, in [0, 2^31 - 1).
+
+    Unlike ``Expr.hash``, whose output may change with the polars version or build,
+    it only relies on integer arithmetic: components are folded into a polynomial
+    hash modulo a prime, which is then scrambled by multiplicative hashing.
+    """
+    h = pl.lit(seed % _HASH_MODULUS, dtype=pl.Int64)
+    for component in components:
+        h = (h * _HASH_BASE + component % _HASH_MODULUS) % _HASH_MODULUS
+    for multiplier in _HASH_MIXERS:
+        h = (h * multiplier + 1) % _HASH_MODULUS
+    return h
+
+
+def _sample_predicate(sample: Optional[Dict[str, Any]]) -> Optional[pl.Expr]:
+    """Predicate on raw flight columns selecting a deterministic subset of flights.
+
+    Flights can be restricted to `months` (e.g. "2022-01") and operating `carriers`,
+    and sampled by the hash of their flight key (see ``_flight_key_components`` and
+    ``_stable_hash``), keeping roughly `fraction` of them. The predicate only depends
+    on the values of each row, so the same flights are kept regardless of how the
+    input is read (whole or in chunks) and of the polars version, and it can be pushed
+    down to the CSV scan.
+    """
+    if not sample:
+        return None
+
+    predicates: List[pl.Expr] = []
+    if sample.get("months"):
+        predicates.append(
+            pl.col("FL_DATE").str.to_date().dt.strftime("%Y-%m").is_in(sample["months"])
+        )
+    if sample.get("carriers"):
+        predicates.append(pl.col("OP_UNIQUE_CARRIER").is_in(sample["carriers"]))
+    if sample.get("fraction") is not None:
+        flight_hash = _stable_hash(_flight_key_components(), sample.get("seed", 0))
+        predicates.append(
+            flight_hash % SAMPLE_HASH_BUCKETS
+            < int(sample["fraction"] * SAMPLE_HASH_BUCKETS)
+        )
+    if not predicates:
+        return None
+
+    log.info(f"Sampling flights with {sample}")
+    predicate = predicates[0]
+    for p in predicates[1:]:
+        predicate = predicate & p
+    return predicate
+
+
+def transform_flights(
+    flights: CSVSource,
+    airports: pl.DataFrame,
+    params: Dict[str, Any],
+) -> Tuple[
+    Dict[str, Union[pl.DataFrame, Callable[[], pl.DataFrame]]],
+    Dict[str, Union[PartitionStats, Callable[[], PartitionStats]]],
+]:
+    """Initial transformation of flight data.
+    Also emits the metadata sidecar of each partition.
+    Flights get the indices of their origin and destination airports,
+    see ``_with_airport_indices``, and sidecars the fingerprint of the airport index.
+
+    If ``params["out_of_core"]`` is set, or flights are split across several files
+    (e.g. for a multi-year backfill), flights are processed in chunks that are
+    spilled to disk per month, see ``_transform_flights_out_of_core``.
+    If ``params["sample"]`` is set, only a deterministic subset of flights
+    is processed, see ``_sample_predicate``.
+    """
+    if params["out_of_core"] or len(flights.files) > 1:
+        return _transform_flights_out_of_core(flights, airports, params)
+    return _transform_flights_in_memory(flights, airports, params)
+
+
+def _transform_flights_in_memory(
+    flights: CSVSource,
+    airports: pl.DataFrame,
+    params: Dict[str, Any],
+) -> Tuple[Dict[str, pl.DataFrame], Dict[str, PartitionStats]]:
+    """Partitioning of flight data read into memory at once"""
+    sample = _sample_predicate(params.get("sample"))
+
+    # when sampling, only the sampled rows are materialized
+    flights = (
+        flights.read() if sample is None else flights.scan().filter(sample).collect()
+    )
+    size_unit = "gb"
+    size_raw = flights.estimated_size(unit=size_unit)
+    log.info(f"Raw flights dataset size: {size_raw:.2f} GB")
+    log.info(f"Records: {flights.shape[0]:,}")
+
+    df = _with_airport_indices(
+        _parse_flights(flights.lazy()), airports.lazy()
+    ).collect()
+
     # log size changes post dtype application
     size_parsed = df.estimated_size(unit=size_unit)
     size_diff_pct = (size_parsed - size_raw) / size_raw
     log.info(f"Parsed flights dataset size: {size_parsed:.2f} GB")
     log.info(f"Percentage size difference post dtype application: {size_diff_pct:.2%}")
 
-    # perform column name formatting
-    df.columns = format_column_names(df.columns)
-
     # partition by flight year and month
     p_key = "year_month"
-    partitions = df.with_columns(
-        pl.col("fl_date").dt.strftime("%Y_%m").alias(p_key),
-    ).partition_by(p_key, as_dict=True)
+    partitions = df.with_columns(_flights_partition_key()).partition_by(
+        p_key, as_dict=True
+    )
 
     # remove partitioning column
     for p in partitions.values():
@@ -274,34 +619,177 @@ def transform_flights(flights: pl.DataFrame) -> Dict[str, pl.DataFrame]:
     for old_key, new_key in zip(old_keys, new_keys):
         partitions[new_key] = partitions.pop(old_key)
 
-    return partitions
+    fingerprint = _airport_index_fingerprint(airports)
+    stats = {
+        key: {**compute_partition_stats(p), "airport_index": fingerprint}
+        for key, p in partitions.items()
+    }
+    return partitions, stats
 
 
-def dq_flights(
-    flights: Dict[str, Callable[[], pl.DataFrame]]
-) -> Dict[str, pl.DataFrame]:
-    """Perform quality checks on flight data"""
+def _transform_flights_out_of_core(
+    flights: CSVSource,
+    airports: pl.DataFrame,
+    params: Dict[str, Any],
+) -> Tuple[
+    Dict[str, Callable[[], pl.DataFrame]], Dict[str, Callable[[], PartitionStats]]
+]:
+    """External partitioning of flight data, for inputs larger than memory.
+
+    Each input file is read in chunks of roughly `chunk_rows` records. Each chunk is
+    parsed and its rows are written to per month spill files (Arrow IPC) in
+    `spill_dir`. Input files are processed in parallel, by up to `max_workers`.
+    Months are finalized independently and lazily: the returned partitions are
+    callables, which `PartitionedDataSet` only calls when saving each of them,
+    so only one month has to fit in memory at a time.
+    Sampling (see ``_sample_predicate``) is applied to each chunk before parsing.
+    Airport indices are only added when finalizing months, so spills do not depend on
+    the airports.
+
+    Input files that were completely spilled are recorded in a manifest in
+    `spill_dir`, by their path relative to the project. If `resume` is set, a rerun
+    (e.g. after an interrupted backfill) only processes files that are new, changed,
+    or were not completed, as long as sampling, load arguments, and the data types
+    inferred for the files are the same.
+    """
+    spill_path = Path(params["spill_dir"])
+    manifest_path = spill_path / "manifest.json"
+    settings = {
+        "sample": params.get("sample"),
+        "load_args": flights.load_args,
+        "dtypes": {col: str(dtype) for col, dtype in flights.dtypes.items()},
+    }
+
+    manifest = load_manifest(manifest_path) if params["resume"] else None
+    if manifest is None or not matches_settings(manifest, settings):
+        if spill_path.exists():
+            shutil.rmtree(spill_path)
+        manifest = new_manifest(settings)
+    spill_path.mkdir(parents=True, exist_ok=True)
+
+    files = [os.path.relpath(path) for path in flights.files]
+    if not files:
+        err = f"No flight files matching {flights.filepath}"
+        log.error(rich_error_wrapper(err), extra={"markup": True})
+        raise ValueError(err)
+
+    # spills of files that are no longer part of the input
+    for path in set(manifest["files"]) - set(files):
+        _remove_spills(spill_path, path)
+        del manifest["files"][path]
+
+    pending = [p for p in files if not is_completed(manifest, p, spill_path)]
+    log.info(
+        f"Flight files: {len(files):,}, already spilled: {len(files) - len(pending):,}"
+    )
+
+    sample = _sample_predicate(params.get("sample"))
+    p_key = "year_month"
+    manifest_lock = threading.Lock()
+
+    def _spill_file(path: str) -> int:
+        # leftovers of an interrupted attempt, or of a previous version of the file
+        _remove_spills(spill_path, path)
+        file_id = _spill_file_id(path)
+        records, outputs = 0, []
+        source = flights.file_source(path)
+        for i, chunk in enumerate(source.iter_batches(params["chunk_rows"])):
+            if sample is not None:
+                chunk = chunk.filter(sample)
+            records += chunk.height
+            parsed = (
+                _parse_flights(chunk.lazy(), categoricals=False)
+                .with_columns(_flights_partition_key())
+                .collect()
+            )
+            for year_month, part in parsed.partition_by(p_key, as_dict=True).items():
+                output = f"{year_month}/{file_id}__{i:06d}.arrow"
+                (spill_path / year_month).mkdir(exist_ok=True)
+                part.drop(p_key).write_ipc(spill_path / output)
+                outputs.append(output)
+        with manifest_lock:
+            mark_completed(manifest, path, outputs)
+            save_manifest(manifest_path, manifest)
+        log.info(f"Spilled {path} with {records:,} records")
+        return records
+
+    save_manifest(manifest_path, manifest)
+    with ThreadPoolExecutor(max_workers=params["max_workers"]) as executor:
+        records = sum(map_in_context(executor, _spill_file, pending))
+    log.info(f"Records spilled in this run: {records:,}")
+
+    # sidecars are computed while finalizing each month, to avoid a second read
+    finalized_stats: Dict[str, PartitionStats] = {}
+
+    def _finalize(key: str, month_dir: Path) -> pl.DataFrame:
+        df = _with_airport_indices(
+            _cast_flight_categoricals(pl.scan_ipc(str(month_dir / "*.arrow"))),
+            airports.lazy(),
+        ).collect()
+        finalized_stats[key] = {
+            **compute_partition_stats(df),
+            "airport_index": _airport_index_fingerprint(airports),
+        }
+        log.info(f"Finalized {key}: {df.height:,} records")
+        return df
+
+    def _stats(key: str, month_dir: Path) -> PartitionStats:
+        if key not in finalized_stats:
+            _finalize(key, month_dir)
+        return finalized_stats.pop(key)
+
+    # months can be left without spills, e.g. after deleting or changing input files
+    month_dirs = {
+        f"flights_{d.name}": d
+        for d in sorted(spill_path.iterdir())
+        if d.is_dir() and any(d.glob("*.arrow"))
+    }
+    partitions = {key: partial(_finalize, key, d) for key, d in month_dirs.items()}
+    stats = {key: partial(_stats, key, d) for key, d in month_dirs.items()}
+    return partitions, stats
+
+
+def _spill_file_id(path: str) -> str:
+    """Unique prefix of the spill files of an input file"""
+    return f"{Path(path).stem}_{hashlib.md5(path.encode()).hexdigest()[:8]}"
+
+
+def _remove_spills(spill_path: Path, path: str) -> None:
+    for spill in spill_path.glob(f"*/{_spill_file_id(path)}__*.arrow"):
+        spill.unlink()
+
 
-    for year_month, data_func in flights.items():
-        # first load the data for the currently processed partition
-        data = data_func()
+def dq_flights(
+    flights: Dict[str, Callable[[], pl.DataFrame]],
+    flights_stats: Dict[str, Callable[[], PartitionStats]],
+) -> Tuple[Dict[str, pl.DataFrame], Dict[str, PartitionStats]]:
+    """Perform quality checks on flight data.
+    All checks are answered from the metadata sidecars, so no partition is loaded.
+    """
+    stats = load_partition_stats(flights_stats)
+    cols_for_null_checks = [
+        "fl_date",
+        "origin",
+        "destination",
+        "op_unique_carrier",
+        "mkt_unique_carrier",
+    ]
+
+    for year_month in flights:
+        partition_stats = stats[year_month]
 
         # run all generic checks
-        _run_generic_dq(data)
+        _run_generic_dq_on_stats(partition_stats)
 
         # check for null values in specific columns
-        cols_for_null_checks = [
-            "fl_date",
-            "origin",
-            "destination",
-            "op_unique_carrier",
-            "mkt_unique_carrier",
-        ]
-        null_counts = data.select(cols_for_null_checks).null_count()
-        if sum(null_counts.row(0)) != 0:
+        null_counts = {
+            col: partition_stats["columns"][col]["null_count"]
+            for col in cols_for_null_checks
+        }
+        if sum(null_counts.values()) != 0:
             err = (
                 f"Null values for relevant columns detected in {year_month} partition!"
-                " (printing at most 5 of them)"
+                f" {null_counts}"
             )
             log.error(rich_error_wrapper(err), extra={"markup": True})
             raise ValueError(err)
@@ -311,120 +799,151 @@ def dq_flights(
         rich_success_wrapper("All DQ checks on flights data passed!"),
         extra={"markup": True},
     )
-
-    return flights
+    log.info(f"Validated flight records: {total_row_count(stats):,}")
+
+    return flights, stats
+
+
+def _op_carrier_plan(data: pl.LazyFrame) -> pl.LazyFrame:
+    """Lazy plan of the operating carrier aggregate for a single partition"""
+    return data.groupby("fl_date", "op_unique_carrier").agg(
+        # departure delay
+        total_departure_delay=pl.sum("dep_delay"),
+        avg_departure_delay=pl.avg("dep_delay"),
+        median_departure_delay=pl.median("dep_delay"),
+        # airtime
+        total_airtime=pl.sum("air_time"),
+        avg_airtime=pl.avg("air_time"),
+        median_airtime=pl.median("air_time"),
+        # distance
+        total_distance=pl.sum("distance"),
+        avg_distance=pl.avg("distance"),
+        median_distance=pl.median("distance"),
+    )
 
 
-def agg_by_op_carrier(data: Dict[str, Callable[[], pl.DataFrame]]) -> pl.DataFrame:
+def agg_by_op_carrier(
+    data: Dict[str, Callable[[], pl.DataFrame]],
+    data_stats: Dict[str, Callable[[], PartitionStats]],
+    scheduling: Dict[str, Any],
+) -> pl.DataFrame:
     """Create business level aggregate
     for delay, airtime, and distance
     per date and operating carrier
     """
     # compute aggregates per partition
-    aggregates_per_partition: List[pl.DataFrame] = []
-    for data_func in data.values():
-        df = data_func()
-        aggregates_per_partition.append(
-            df.lazy()
-            .groupby("fl_date", "op_unique_carrier")
-            .agg(
-                # departure delay
-                total_departure_delay=pl.sum("dep_delay"),
-                avg_departure_delay=pl.avg("dep_delay"),
-                median_departure_delay=pl.median("dep_delay"),
-                # airtime
-                total_airtime=pl.sum("air_time"),
-                avg_airtime=pl.avg("air_time"),
-                median_airtime=pl.median("air_time"),
-                # distance
-                total_distance=pl.sum("distance"),
-                avg_distance=pl.avg("distance"),
-                median_distance=pl.median("distance"),
-            )
-            .collect()
-        )
+    aggregates_per_partition = run_partitions(
+        "agg_by_op_carrier",
+        lambda _, df: _op_carrier_plan(df.lazy()).collect(),
+        data,
+        partition_sizes(load_partition_stats(data_stats)),
+        scheduling,
+    )
 
     # combine all partitions
-    result = pl.concat(aggregates_per_partition).sort(
+    result = pl.concat(list(aggregates_per_partition.values())).sort(
         by=["fl_date", "op_unique_carrier"]
     )
     log.info(f"Schema of operating carrier agg {result.schema}")
     return result
 
 
-def agg_by_departure_airport(
-    data: Dict[str, Callable[[], pl.DataFrame]]
-) -> pl.DataFrame:
-    """Create business level aggregate
-    per airport with connection counts
-    and frequencies per operating carrier
-    """
-    # gather required data in a single dataframe
-    df = pl.concat(
-        [
-            load_df().select(
-                "fl_date",
-                "origin",
-                "destination",
-                "dep_delay",
-                "op_unique_carrier",
-                "active_weather",
-            )
-            for load_df in data.values()
-        ]
-    )
+def _route_counts_plan(data: pl.LazyFrame) -> pl.LazyFrame:
+    """Lazy plan of the number of flights per route (origin and destination)"""
+    return data.groupby("origin", "destination").agg(count_flights=pl.count())
 
-    # count overall connections, departures, and arrivals
-    result = (
-        df.lazy()
-        .groupby("origin")
+
+def _departure_airport_plan(routes: pl.LazyFrame) -> pl.LazyFrame:
+    """Lazy plan of the departure airport aggregate over all partitions,
+    from the number of flights per route (see ``_route_counts_plan``)
+    """
+    return (
+        routes.groupby("origin")
         .agg(
             count_connections=pl.n_unique("destination"),
-            count_departures=pl.count(),
+            count_departures=pl.sum("count_flights"),
         )
         .join(
-            df.lazy().groupby("destination").agg(count_arrivals=pl.count()),
+            routes.groupby("destination").agg(count_arrivals=pl.sum("count_flights")),
             left_on="origin",
             right_on="destination",
         )
         .sort("count_connections", descending=True)
-        .collect()
     )
+
+
+def agg_by_departure_airport(
+    data_stats: Dict[str, Callable[[], PartitionStats]],
+) -> pl.DataFrame:
+    """Create business level aggregate
+    per airport with connection counts
+    and frequencies per operating carrier.
+    Answered from the route counts in the metadata sidecars, so no partition is loaded.
+    """
+    stats = load_partition_stats(data_stats)
+    log.info(f"Aggregating {total_row_count(stats):,} departures")
+
+    # flights per route, summed over all partitions
+    routes = (
+        pl.DataFrame(
+            [route for s in stats.values() for route in s["route_counts"]],
+            schema=[
+                ("origin", pl.Utf8),
+                ("destination", pl.Utf8),
+                ("count_flights", pl.UInt32),
+            ],
+            orient="row",
+        )
+        .groupby("origin", "destination")
+        .agg(pl.sum("count_flights"))
+    )
+
+    # count overall connections, departures, and arrivals
+    # origins without any arrivals are dropped by the inner join
+    result = _departure_airport_plan(routes.lazy()).collect()
     log.info(f"Schema of departure airport aggregates: {result.schema}")
     print(result.head())
     return result
 
 
-def agg_by_state(data: Dict[str, Callable[[], pl.DataFrame]]) -> pl.DataFrame:
+def _state_plan(data: pl.LazyFrame) -> pl.LazyFrame:
+    """Lazy plan of the state aggregate for a single partition"""
+    return (
+        data.with_columns(pl.col("fl_date").dt.month_start().alias("month"))
+        .groupby("month", "origin_state_name", "origin_state_code")
+        .agg(
+            count_departures=pl.count(),
+            count_unique_airports=pl.n_unique("origin"),
+            count_unique_operating_carriers=pl.n_unique("op_unique_carrier"),
+            count_citizens=pl.first("origin_state_population"),
+        )
+        .with_columns(
+            (
+                1_000_000 * pl.col("count_unique_airports") / pl.col("count_citizens")
+            ).alias("airports_per_million_citizens"),
+            (1_000_000 * pl.col("count_departures") / pl.col("count_citizens")).alias(
+                "departures_per_million_citizens"
+            ),
+        )
+    )
+
+
+def agg_by_state(
+    data: Dict[str, Callable[[], pl.DataFrame]],
+    data_stats: Dict[str, Callable[[], PartitionStats]],
+    scheduling: Dict[str, Any],
+) -> pl.DataFrame:
     """Create business level aggregate
     per state with flight counts and population
     """
-    outputs: List[pl.DataFrame] = []
-    for data_func in data.values():
-        df = data_func()
-        outputs.append(
-            df.lazy()
-            .with_columns(pl.col("fl_date").dt.month_start().alias("month"))
-            .groupby("month", "origin_state_name", "origin_state_code")
-            .agg(
-                count_departures=pl.count(),
-                count_unique_airports=pl.n_unique("origin"),
-                count_unique_operating_carriers=pl.n_unique("op_unique_carrier"),
-                count_citizens=pl.first("origin_state_population"),
-            )
-            .with_columns(
-                (
-                    1_000_000
-                    * pl.col("count_unique_airports")
-                    / pl.col("count_citizens")
-                ).alias("airports_per_million_citizens"),
-                (
-                    1_000_000 * pl.col("count_departures") / pl.col("count_citizens")
-                ).alias("departures_per_million_citizens"),
-            )
-            .collect()
-        )
-    result = pl.concat(outputs).sort(
+    outputs = run_partitions(
+        "agg_by_state",
+        lambda _, df: _state_plan(df.lazy()).collect(),
+        data,
+        partition_sizes(load_partition_stats(data_stats)),
+        scheduling,
+    )
+    result = pl.concat(list(outputs.values())).sort(
         by=["month", "count_departures"], descending=[False, True]
     )
     log.info(f"Schema of state agg: {result.schema}")
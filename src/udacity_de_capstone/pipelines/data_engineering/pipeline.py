@@ -14,6 +14,7 @@ from .nodes import (
     dq_flights,
     dq_population,
     transform_airports,
+    transform_county_population,
     transform_flights,
     transform_population,
 )
@@ -36,6 +37,20 @@ def create_pipeline(**kwargs) -> Pipeline:
                 name="validate_population",
                 tags="population",
             ),
+            node(
+                func=transform_county_population,
+                inputs="raw_county_population",
+                outputs="county_population_transformed",
+                name="transform_county_population",
+                tags="population",
+            ),
+            node(
+                func=dq_population,
+                inputs="county_population_transformed",
+                outputs="county_population_validated",
+                name="validate_county_population",
+                tags="population",
+            ),
             node(
                 func=transform_airports,
                 inputs="raw_airports",
@@ -52,15 +67,15 @@ def create_pipeline(**kwargs) -> Pipeline:
             ),
             node(
                 func=transform_flights,
-                inputs="raw_flights",
-                outputs="flights_transformed",
+                inputs=["raw_flights", "airports_validated", "params:flights"],
+                outputs=["flights_transformed", "flights_transformed_stats"],
                 name="transform_flights",
                 tags="flights",
             ),
             node(
                 func=dq_flights,
-                inputs="flights_transformed",
-                outputs="flights_validated",
+                inputs=["flights_transformed", "flights_transformed_stats"],
+                outputs=["flights_validated", "flights_validated_stats"],
                 name="validate_flights",
                 tags="flights",
             ),
@@ -68,33 +83,35 @@ def create_pipeline(**kwargs) -> Pipeline:
                 func=combine_all_data,
                 inputs=[
                     "flights_validated",
+                    "flights_validated_stats",
                     "airports_validated",
                     "population_validated",
                     "raw_cancellation_codes",
                     "raw_weather_codes",
                     "raw_carriers",
+                    "params:scheduling",
                 ],
-                outputs="combined_all",
+                outputs=["combined_all", "combined_all_stats"],
                 name="combine_all_sources",
                 tags="combined",
             ),
             node(
                 func=agg_by_op_carrier,
-                inputs="combined_all",
+                inputs=["combined_all", "combined_all_stats", "params:scheduling"],
                 outputs="operating_carrier_stats",
                 name="create_operating_carrier_aggregate",
                 tags="business",
             ),
             node(
                 func=agg_by_state,
-                inputs="combined_all",
+                inputs=["combined_all", "combined_all_stats", "params:scheduling"],
                 outputs="state_stats",
                 name="create_state_level_aggregate",
                 tags="business",
             ),
             node(
                 func=agg_by_departure_airport,
-                inputs="combined_all",
+                inputs="combined_all_stats",
                 outputs="departure_airport_stats",
                 name="create_departure_airport_level_aggregate",
                 tags="business",
@@ -0,0 +1,178 @@
+"""
+Compact route network structures and vectorized graph metrics.
+
+Airports are nodes with dense integer ids, routes are directed weighted edges,
+stored in CSR (compressed sparse row) format: the out-neighbours of node `i` are
+``indices[indptr[i]:indptr[i + 1]]``. All metrics are computed with numpy array
+operations; the only Python loops are over power iterations or hops.
+Neighbour sets are packed into bitsets (one bit per airport) for reachability
+and redundancy, keeping memory at n^2 / 8 bytes for n airports.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Tuple
+
+from udacity_de_capstone.utils import lazy_import
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_import("numpy")
+
+
+@dataclass(frozen=True)
+class CSRGraph:
+    """Directed, weighted graph in CSR format"""
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    weights: np.ndarray
+
+    @classmethod
+    def from_edges(
+        cls, sources: np.ndarray, targets: np.ndarray, weights: np.ndarray, n: int
+    ) -> CSRGraph:
+        """Builds the graph from (unsorted) edge arrays and the number of nodes"""
+        sources = np.asarray(sources, dtype=np.int64)
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+        return cls(
+            indptr=indptr,
+            indices=np.asarray(targets, dtype=np.int64)[order],
+            weights=np.asarray(weights, dtype=np.float64)[order],
+        )
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def sources(self) -> np.ndarray:
+        """Source node of every edge, aligned with `indices`"""
+        return np.repeat(np.arange(self.n_nodes), np.diff(self.indptr))
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        return np.bincount(self.indices, minlength=self.n_nodes)
+
+    def out_strength(self) -> np.ndarray:
+        """Sum of outgoing edge weights per node"""
+        return np.bincount(self.sources, self.weights, minlength=self.n_nodes)
+
+    def in_strength(self) -> np.ndarray:
+        """Sum of incoming edge weights per node"""
+        return np.bincount(self.indices, self.weights, minlength=self.n_nodes)
+
+    def transpose(self) -> CSRGraph:
+        return CSRGraph.from_edges(
+            self.indices, self.sources, self.weights, self.n_nodes
+        )
+
+
+@lru_cache(maxsize=None)
+def _popcount_table() -> np.ndarray:
+    return np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(bitsets: np.ndarray) -> np.ndarray:
+    """Number of set bits per row of packed bitsets"""
+    return _popcount_table()[bitsets].sum(axis=-1, dtype=np.int64)
+
+
+def neighbour_bitsets(graph: CSRGraph) -> np.ndarray:
+    """Out-neighbours of each node, as rows of packed bitsets (n, ceil(n / 8))"""
+    n = graph.n_nodes
+    bitsets = np.zeros((n, (n + 7) // 8), dtype=np.uint8)
+    np.bitwise_or.at(
+        bitsets,
+        (graph.sources, graph.indices >> 3),
+        (1 << (7 - (graph.indices & 7))).astype(np.uint8),
+    )
+    return bitsets
+
+
+def reachable_within(graph: CSRGraph, max_hops: int) -> np.ndarray:
+    """Number of other nodes reachable from each node in at most `max_hops` edges.
+
+    The reachable set of a node after k hops is the union of its own set and
+    the (k - 1)-hop sets of its out-neighbours, which is a segmented OR-reduction
+    over the CSR rows.
+    """
+    n = graph.n_nodes
+    reachable = np.packbits(np.eye(n, dtype=bool), axis=1)
+    has_neighbours = graph.out_degree() > 0
+    starts = graph.indptr[:-1][has_neighbours]
+    for _ in range(max_hops):
+        if not len(starts):
+            break
+        expanded = np.bitwise_or.reduceat(reachable[graph.indices], starts, axis=0)
+        reachable[has_neighbours] |= expanded
+    return _popcount(reachable) - 1
+
+
+def alternative_paths(graph: CSRGraph) -> np.ndarray:
+    """Number of one-stop alternatives (s -> u -> v) for every edge s -> v.
+
+    Aligned with `graph.indices`. Computed as the size of the intersection between
+    the out-neighbours of s and the in-neighbours of v.
+    """
+    out_bitsets = neighbour_bitsets(graph)
+    in_bitsets = neighbour_bitsets(graph.transpose())
+    return _popcount(out_bitsets[graph.sources] & in_bitsets[graph.indices])
+
+
+def pagerank(
+    graph: CSRGraph,
+    damping: float = 0.85,
+    max_iterations: int = 100,
+    tolerance: float = 1e-10,
+) -> np.ndarray:
+    """Weighted PageRank, where dangling nodes jump to any node uniformly"""
+    n = graph.n_nodes
+    sources = graph.sources
+    out_strength = graph.out_strength()
+    transition = graph.weights / out_strength[sources]
+    dangling = out_strength == 0
+
+    rank = np.full(n, 1 / n)
+    for _ in range(max_iterations):
+        flow = (
+            np.bincount(graph.indices, transition * rank[sources], minlength=n)
+            + rank[dangling].sum() / n
+        )
+        new_rank = (1 - damping) / n + damping * flow
+        converged = np.abs(new_rank - rank).sum() < tolerance
+        rank = new_rank
+        if converged:
+            break
+    return rank
+
+
+def hits(
+    graph: CSRGraph, max_iterations: int = 100, tolerance: float = 1e-10
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Weighted HITS hub and authority scores, normalized to unit length"""
+    n = graph.n_nodes
+    sources = graph.sources
+    hubs = np.full(n, 1 / np.sqrt(n))
+    authorities = hubs
+    for _ in range(max_iterations):
+        authorities = np.bincount(
+            graph.indices, graph.weights * hubs[sources], minlength=n
+        )
+        authorities /= np.linalg.norm(authorities) or 1
+        new_hubs = np.bincount(
+            sources, graph.weights * authorities[graph.indices], minlength=n
+        )
+        new_hubs /= np.linalg.norm(new_hubs) or 1
+        converged = np.abs(new_hubs - hubs).sum() < tolerance
+        hubs = new_hubs
+        if converged:
+            break
+    return hubs, authorities
@@ -0,0 +1,170 @@
+"""
+This is a boilerplate pipeline 'network'
+generated using Kedro 0.18.8
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
+
+from udacity_de_capstone.utils import lazy_import
+
+from .graph import CSRGraph, alternative_paths, hits, pagerank, reachable_within
+
+if TYPE_CHECKING:
+    import polars as pl
+else:
+    pl = lazy_import("polars")
+
+log = logging.getLogger(__name__)
+
+
+def build_route_graph(flights: pl.DataFrame) -> Tuple[pl.Series, CSRGraph, pl.Series]:
+    """Builds the route network of a set of flights.
+
+    Airports get dense integer ids (their position in the returned `airports` series).
+    Edges are weighted by the number of flights, and the average departure delay
+    of each route is returned aligned with the edges of the graph.
+    Can be used as is from notebooks, e.g. with a single `combined_all` partition.
+    """
+    routes = (
+        flights.lazy()
+        .select(
+            pl.col("origin").cast(pl.Utf8),
+            pl.col("destination").cast(pl.Utf8),
+            "dep_delay",
+        )
+        .filter(pl.col("origin") != pl.col("destination"))
+        .groupby("origin", "destination")
+        .agg(
+            count_flights=pl.count(),
+            avg_departure_delay=pl.avg("dep_delay"),
+        )
+        .collect()
+    )
+    airports = (
+        pl.concat([routes["origin"], routes["destination"]]).unique().sort()
+    ).alias("airport")
+    ids = airports.to_frame().with_row_count("id")
+    edges = routes.join(
+        ids.rename({"airport": "origin", "id": "source"}), on="origin"
+    ).join(ids.rename({"airport": "destination", "id": "target"}), on="destination")
+
+    order = edges["source"].arg_sort()
+    edges = edges[order]
+    graph = CSRGraph.from_edges(
+        edges["source"].to_numpy(),
+        edges["target"].to_numpy(),
+        edges["count_flights"].to_numpy(),
+        len(airports),
+    )
+    return airports, graph, edges["avg_departure_delay"]
+
+
+def _metrics_schema() -> Dict[str, pl.PolarsDataType]:
+    """Schema of ``route_network_metrics``, e.g. for networks without any route"""
+    return {
+        "airport": pl.Utf8,
+        "out_degree": pl.Int64,
+        "in_degree": pl.Int64,
+        "count_departures": pl.Int64,
+        "count_arrivals": pl.Int64,
+        "pagerank": pl.Float64,
+        "hub_score": pl.Float64,
+        "authority_score": pl.Float64,
+        "count_reachable_airports": pl.Int64,
+        "avg_departure_delay": pl.Float64,
+        "count_redundant_routes": pl.UInt32,
+        "avg_alternative_paths": pl.Float64,
+        "share_redundant_routes": pl.Float64,
+    }
+
+
+def route_network_metrics(
+    flights: pl.DataFrame, params: Dict[str, Any]
+) -> pl.DataFrame:
+    """Computes network metrics per airport for a set of flights"""
+    airports, graph, delays = build_route_graph(flights)
+    if not len(airports):
+        return pl.DataFrame(schema=_metrics_schema())
+
+    hubs, authorities = hits(graph, params["max_iterations"], params["tolerance"])
+    alternatives = alternative_paths(graph)
+    sources = graph.sources
+    departures = graph.out_strength()
+
+    # per route metrics, aggregated to the origin airport
+    per_route = pl.DataFrame(
+        {
+            "id": pl.Series(sources, dtype=pl.UInt32),
+            "weight": graph.weights,
+            "delay": delays,
+            "alternatives": alternatives,
+        }
+    )
+    per_origin = per_route.groupby("id").agg(
+        avg_departure_delay=(pl.col("delay") * pl.col("weight")).sum()
+        / pl.col("weight").sum(),
+        count_redundant_routes=(pl.col("alternatives") > 0).sum(),
+        avg_alternative_paths=pl.col("alternatives").mean(),
+    )
+
+    return (
+        pl.DataFrame(
+            {
+                "airport": airports,
+                "out_degree": graph.out_degree(),
+                "in_degree": graph.in_degree(),
+                "count_departures": departures,
+                "count_arrivals": graph.in_strength(),
+                "pagerank": pagerank(
+                    graph,
+                    params["damping"],
+                    params["max_iterations"],
+                    params["tolerance"],
+                ),
+                "hub_score": hubs,
+                "authority_score": authorities,
+                "count_reachable_airports": reachable_within(graph, params["max_hops"]),
+            }
+        )
+        .with_row_count("id")
+        .join(per_origin, on="id", how="left")
+        .with_columns(
+            pl.col("count_departures").cast(pl.Int64),
+            pl.col("count_arrivals").cast(pl.Int64),
+            pl.col("count_redundant_routes").fill_null(0),
+            (pl.col("count_redundant_routes") / pl.col("out_degree")).alias(
+                "share_redundant_routes"
+            ),
+        )
+        .drop("id")
+    )
+
+
+def agg_route_network(
+    data: Dict[str, Callable[[], pl.DataFrame]], params: Dict[str, Any]
+) -> pl.DataFrame:
+    """Create business level aggregate
+    with route network metrics per month and airport
+    """
+    outputs: List[pl.DataFrame] = []
+    for partition_id, data_func in data.items():
+        df = data_func().select("fl_date", "origin", "destination", "dep_delay")
+        if df.is_empty():
+            continue
+        month = df.select(pl.col("fl_date").dt.month_start().min()).item()
+        metrics = route_network_metrics(df, params)
+        log.info(f"Route network of {partition_id}: {metrics.height:,} airports")
+        if metrics.is_empty():
+            continue
+        outputs.append(metrics.select(pl.lit(month).alias("month"), pl.all()))
+
+    if not outputs:
+        log.warning("No routes found in any partition")
+        return pl.DataFrame(schema={"month": pl.Date, **_metrics_schema()})
+
+    result = pl.concat(outputs).sort(by=["month", "pagerank"], descending=[False, True])
+    log.info(f"Schema of route network agg: {result.schema}")
+    return result
@@ -0,0 +1,22 @@
+"""
+This is a boilerplate pipeline 'network'
+generated using Kedro 0.18.8
+"""
+
+from kedro.pipeline import Pipeline, node, pipeline
+
+from .nodes import agg_route_network
+
+
+def create_pipeline(**kwargs) -> Pipeline:
+    return pipeline(
+        [
+            node(
+                func=agg_route_network,
+                inputs=["combined_all", "params:network"],
+                outputs="route_network_stats",
+                name="create_route_network_aggregate",
+                tags="business",
+            ),
+        ]
+    )
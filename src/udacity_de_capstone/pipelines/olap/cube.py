@@ -0,0 +1,172 @@
+"""
+Flights cube of additive measures, and roll-ups over it.
+
+The cube holds one row per flight date, operating carrier, origin state, and
+destination state. Its measures are counts, sums, and sums of squares (plus
+min / max and a histogram for departure delays), which can be summed up
+to any coarser combination of these dimensions. Averages, standard deviations,
+and approximate quantiles are derived after rolling up, so any grain can be
+answered from the cube without reading the flight partitions again.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+from udacity_de_capstone.utils import lazy_import
+
+if TYPE_CHECKING:
+    import numpy as np
+    import polars as pl
+else:
+    np = lazy_import("numpy")
+    pl = lazy_import("polars")
+
+CUBE_DIMENSIONS = (
+    "fl_date",
+    "op_unique_carrier",
+    "origin_state_code",
+    "destination_state_code",
+)
+CUBE_MEASURES = ("dep_delay", "taxi_out", "air_time", "distance")
+HISTOGRAM_MEASURE = "dep_delay"
+
+
+def _histogram_columns(n_edges: int) -> List[str]:
+    """Histogram buckets: (-inf, e_0), [e_0, e_1), ..., [e_n-1, inf)"""
+    return [f"count_{HISTOGRAM_MEASURE}_bucket_{i}" for i in range(n_edges + 1)]
+
+
+def cube_aggregations(bucket_edges: Sequence[int]) -> List[pl.Expr]:
+    """Base measures of the cube, for aggregating flights by the cube dimensions"""
+    measures = [
+        pl.count().alias("count_flights"),
+        pl.sum("cancelled").alias("count_cancelled"),
+    ]
+    for col in CUBE_MEASURES:
+        measures += [
+            pl.col(col).is_not_null().sum().alias(f"count_{col}"),
+            pl.sum(col).alias(f"sum_{col}"),
+            (pl.col(col) * pl.col(col)).sum().alias(f"sum_sq_{col}"),
+        ]
+
+    delay = pl.col(HISTOGRAM_MEASURE)
+    measures += [
+        delay.min().alias(f"min_{HISTOGRAM_MEASURE}"),
+        delay.max().alias(f"max_{HISTOGRAM_MEASURE}"),
+    ]
+    lower_bounds = [None, *bucket_edges]
+    upper_bounds = [*bucket_edges, None]
+    for name, lower, upper in zip(
+        _histogram_columns(len(bucket_edges)), lower_bounds, upper_bounds
+    ):
+        in_bucket = delay.is_not_null()
+        if lower is not None:
+            in_bucket = in_bucket & (delay >= lower)
+        if upper is not None:
+            in_bucket = in_bucket & (delay < upper)
+        measures.append(in_bucket.sum().alias(name))
+    return measures
+
+
+def build_cube(flights: pl.LazyFrame, bucket_edges: Sequence[int]) -> pl.LazyFrame:
+    """Lazy plan aggregating flights into the cube grain"""
+    return (
+        flights.groupby(*CUBE_DIMENSIONS)
+        .agg(cube_aggregations(bucket_edges))
+        .sort(*CUBE_DIMENSIONS)
+    )
+
+
+def _roll_up_aggregation(measure: str) -> pl.Expr:
+    """Min / max measures are rolled up with min / max, all others are summed"""
+    if measure.startswith("min_"):
+        return pl.min(measure)
+    if measure.startswith("max_"):
+        return pl.max(measure)
+    return pl.sum(measure)
+
+
+def roll_up(
+    cube: pl.DataFrame,
+    by: Sequence[str] = (),
+    every: Optional[str] = None,
+    where: Optional[pl.Expr] = None,
+) -> pl.DataFrame:
+    """Rolls the cube up to a coarser grain.
+
+    Args:
+        cube: the flights cube
+        by: dimensions to keep, a subset of ``CUBE_DIMENSIONS``; all others are
+            rolled up. Use an empty sequence for grand totals.
+        every: date grain if `fl_date` is kept, as a polars interval
+            (e.g. "1w", "1mo", "1q"). Dates are truncated to the start of the interval.
+        where: filter on the dimensions, applied before rolling up
+
+    Returns:
+        Summed base measures per combination of the kept dimensions, together with
+        averages and standard deviations of ``CUBE_MEASURES``.
+    """
+    unknown = set(by) - set(CUBE_DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Unknown cube dimensions {sorted(unknown)}")
+
+    ldf = cube.lazy()
+    if where is not None:
+        ldf = ldf.filter(where)
+    if every is not None and "fl_date" in by:
+        ldf = ldf.with_columns(pl.col("fl_date").dt.truncate(every))
+
+    aggregations = [
+        _roll_up_aggregation(col) for col in cube.columns if col not in CUBE_DIMENSIONS
+    ]
+    if by:
+        ldf = ldf.groupby(*by).agg(aggregations).sort(*by)
+    else:
+        ldf = ldf.select(aggregations)
+
+    derived: List[pl.Expr] = []
+    for col in CUBE_MEASURES:
+        count = pl.col(f"count_{col}")
+        mean = pl.col(f"sum_{col}") / count
+        variance = (pl.col(f"sum_sq_{col}") - count * mean * mean) / (count - 1)
+        derived += [
+            mean.alias(f"avg_{col}"),
+            pl.when(count > 1).then(variance.clip_min(0).sqrt()).alias(f"std_{col}"),
+        ]
+    return ldf.with_columns(derived).collect()
+
+
+def approx_delay_quantile(
+    rolled: pl.DataFrame, quantile: float, bucket_edges: Sequence[int]
+) -> pl.Series:
+    """Approximate quantile of departure delays per row of a (rolled up) cube.
+
+    Delays are assumed to be uniformly distributed within their histogram bucket.
+    The open-ended buckets are bounded by the min / max delay of the row.
+    """
+    counts = rolled.select(_histogram_columns(len(bucket_edges))).to_numpy()
+    counts = counts.astype(np.float64)
+    n_rows, n_buckets = counts.shape
+    cumulative = counts.cumsum(axis=1)
+    target = quantile * cumulative[:, -1]
+
+    bucket = np.minimum((cumulative < target[:, None]).sum(axis=1), n_buckets - 1)
+    rows = np.arange(n_rows)
+    edges = np.tile(np.asarray(bucket_edges, dtype=np.float64), (n_rows, 1))
+    mins = rolled[f"min_{HISTOGRAM_MEASURE}"].cast(pl.Float64).to_numpy()
+    maxs = rolled[f"max_{HISTOGRAM_MEASURE}"].cast(pl.Float64).to_numpy()
+    lower = np.column_stack([mins, edges])
+    upper = np.column_stack([edges, maxs])
+
+    in_bucket = counts[rows, bucket]
+    below = cumulative[rows, bucket] - in_bucket
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(in_bucket > 0, (target - below) / in_bucket, 0.0)
+    low = np.maximum(lower[rows, bucket], mins)
+    high = np.minimum(upper[rows, bucket], maxs)
+    values = low + fraction * (high - low)
+    values[cumulative[:, -1] == 0] = np.nan
+    return pl.Series(
+        f"p{quantile * 100:g}_{HISTOGRAM_MEASURE}", values, nan_to_null=True
+    )
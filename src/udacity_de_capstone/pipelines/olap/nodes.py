@@ -0,0 +1,58 @@
+"""
+This is a boilerplate pipeline 'olap'
+generated using Kedro 0.18.8
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Dict
+
+from udacity_de_capstone.partition_stats import (
+    PartitionStats,
+    load_partition_stats,
+    partition_sizes,
+)
+from udacity_de_capstone.scheduling import run_partitions
+from udacity_de_capstone.utils import lazy_import
+
+from .cube import CUBE_DIMENSIONS, build_cube
+
+if TYPE_CHECKING:
+    import polars as pl
+else:
+    pl = lazy_import("polars")
+
+log = logging.getLogger(__name__)
+
+
+def build_flights_cube(
+    data: Dict[str, Callable[[], pl.DataFrame]],
+    data_stats: Dict[str, Callable[[], PartitionStats]],
+    params: Dict[str, Any],
+    scheduling: Dict[str, Any],
+) -> pl.DataFrame:
+    """Aggregates all flights into the cube of additive base measures.
+    Partitions hold whole months, and the flight date is a cube dimension,
+    so partial cubes of partitions never overlap and are simply concatenated.
+    """
+    bucket_edges = params["delay_bucket_edges"]
+
+    def _build_partition_cube(partition_id: str, df: pl.DataFrame) -> pl.DataFrame:
+        cube = build_cube(df.lazy(), bucket_edges).collect()
+        log.info(f"Built cube of {partition_id} with {cube.height:,} cells")
+        return cube
+
+    cubes = run_partitions(
+        "build_flights_cube",
+        _build_partition_cube,
+        data,
+        partition_sizes(load_partition_stats(data_stats)),
+        scheduling,
+    )
+
+    result = pl.concat(list(cubes.values())).sort(*CUBE_DIMENSIONS)
+    flights = result.select(pl.sum("count_flights")).item()
+    log.info(f"Flights cube: {result.height:,} cells for {flights:,} flights")
+    log.info(f"Schema of flights cube: {result.schema}")
+    return result
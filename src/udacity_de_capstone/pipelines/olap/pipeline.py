@@ -0,0 +1,27 @@
+"""
+This is a boilerplate pipeline 'olap'
+generated using Kedro 0.18.8
+"""
+
+from kedro.pipeline import Pipeline, node, pipeline
+
+from .nodes import build_flights_cube
+
+
+def create_pipeline(**kwargs) -> Pipeline:
+    return pipeline(
+        [
+            node(
+                func=build_flights_cube,
+                inputs=[
+                    "combined_all",
+                    "combined_all_stats",
+                    "params:olap",
+                    "params:scheduling",
+                ],
+                outputs="flights_cube",
+                name="build_flights_cube",
+                tags="business",
+            ),
+        ]
+    )
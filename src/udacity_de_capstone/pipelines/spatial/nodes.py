@@ -0,0 +1,250 @@
+"""
+This is a boilerplate pipeline 'spatial'
+generated using Kedro 0.18.8
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from typing import TYPE_CHECKING, Any, Dict
+
+from udacity_de_capstone.utils import (
+    format_column_names,
+    lazy_import,
+    rich_error_wrapper,
+    rich_success_wrapper,
+)
+
+if TYPE_CHECKING:
+    import polars as pl
+else:
+    pl = lazy_import("polars")
+
+log = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+# consistent with the haversine distance, so that no candidate is missed
+KM_PER_DEGREE_LATITUDE = EARTH_RADIUS_KM * math.pi / 180
+# relative slack of grid spans, for rounding errors of distances at the radius
+SPAN_SLACK = 1e-9
+
+
+def _grid_cell(coordinate: str, cell_size_deg: float) -> pl.Expr:
+    """Index of the grid cell a coordinate falls into"""
+    return (pl.col(coordinate) / cell_size_deg).floor().cast(pl.Int64)
+
+
+def _haversine_km(lat_1: str, lon_1: str, lat_2: str, lon_2: str) -> pl.Expr:
+    """Great circle distance between two coordinates, in kilometers"""
+    to_rad = math.pi / 180
+    d_lat = (pl.col(lat_2) - pl.col(lat_1)) * to_rad
+    d_lon = (pl.col(lon_2) - pl.col(lon_1)) * to_rad
+    a = (d_lat / 2).sin() ** 2 + (pl.col(lat_1) * to_rad).cos() * (
+        pl.col(lat_2) * to_rad
+    ).cos() * (d_lon / 2).sin() ** 2
+    return 2 * EARTH_RADIUS_KM * a.sqrt().arcsin()
+
+
+def _candidate_counties(
+    airports: pl.LazyFrame,
+    county_index: pl.LazyFrame,
+    radius_km: float,
+    cell_size_deg: float,
+) -> pl.LazyFrame:
+    """Pairs of airports and counties with centroids within `radius_km` of each other.
+
+    Each airport is expanded to the grid cells that can hold a centroid within the
+    radius (more longitude cells closer to the poles), which are then joined to the
+    index. Distances are only computed for these candidates. The index is joined
+    one turn east and west as well, for candidates across the antimeridian.
+    """
+    radius_deg = radius_km / KM_PER_DEGREE_LATITUDE
+    lat_span = math.ceil(radius_deg * (1 + SPAN_SLACK) / cell_size_deg)
+    # largest longitude difference within the radius, unless it covers a pole
+    to_rad = math.pi / 180
+    max_lon_diff = (
+        math.sin(radius_deg * to_rad) / (pl.col("latitude") * to_rad).cos()
+    ).arcsin() / to_rad
+    lon_span = (
+        pl.when(pl.col("latitude").abs() + radius_deg < 90)
+        .then(max_lon_diff * (1 + SPAN_SLACK) / cell_size_deg)
+        .otherwise(180 / cell_size_deg)
+        .ceil()
+        .cast(pl.Int64)
+    )
+    county_index = pl.concat(
+        [
+            county_index.with_columns(pl.col("longitude") + turn).with_columns(
+                _grid_cell("longitude", cell_size_deg).alias("lon_cell")
+            )
+            for turn in (-360.0, 0.0, 360.0)
+        ]
+    )
+
+    return (
+        airports.with_columns(
+            _grid_cell("latitude", cell_size_deg).alias("lat_cell"),
+            _grid_cell("longitude", cell_size_deg).alias("lon_cell"),
+            lon_span.alias("lon_span"),
+        )
+        .with_columns(
+            pl.arange(
+                pl.col("lat_cell") - lat_span, pl.col("lat_cell") + lat_span + 1
+            ).alias("candidate_lat_cell"),
+            pl.arange(
+                pl.col("lon_cell") - pl.col("lon_span"),
+                pl.col("lon_cell") + pl.col("lon_span") + 1,
+            ).alias("candidate_lon_cell"),
+        )
+        .explode("candidate_lat_cell")
+        .explode("candidate_lon_cell")
+        .join(
+            county_index,
+            left_on=["candidate_lat_cell", "candidate_lon_cell"],
+            right_on=["lat_cell", "lon_cell"],
+            how="inner",
+            suffix="_county",
+        )
+        .with_columns(
+            _haversine_km(
+                "latitude", "longitude", "latitude_county", "longitude_county"
+            ).alias("distance_km")
+        )
+        .filter(pl.col("distance_km") <= radius_km)
+    )
+
+
+def build_county_index(
+    county_centroids: pl.DataFrame,
+    county_population: pl.DataFrame,
+    metro_areas: pl.DataFrame,
+    params: Dict[str, Any],
+) -> pl.DataFrame:
+    """Builds the grid index over county centroids,
+    enriched with county population and metro area (CBSA)
+    """
+    centroids = county_centroids.clone()
+    centroids.columns = format_column_names(centroids.columns)
+    metros = metro_areas.clone()
+    metros.columns = format_column_names(metros.columns)
+
+    cell_size_deg = params["cell_size_deg"]
+    index = (
+        centroids.lazy()
+        .select(
+            pl.col("geoid").cast(pl.Int64).alias("fips"),
+            pl.col("name").alias("county_name"),
+            pl.col("usps").alias("state_code"),
+            pl.col("intptlat").alias("latitude"),
+            pl.col("intptlong").alias("longitude"),
+        )
+        .join(
+            county_population.lazy().select("fips", "population"),
+            on="fips",
+            how="left",
+        )
+        .join(
+            metros.lazy()
+            .select(
+                (
+                    pl.col("fips_state_code").cast(pl.Int64) * 1000
+                    + pl.col("fips_county_code").cast(pl.Int64)
+                ).alias("fips"),
+                pl.col("cbsa_code").cast(pl.Int64),
+                pl.col("cbsa_title"),
+            )
+            .unique(subset="fips"),
+            on="fips",
+            how="left",
+        )
+        .with_columns(
+            _grid_cell("latitude", cell_size_deg).alias("lat_cell"),
+            _grid_cell("longitude", cell_size_deg).alias("lon_cell"),
+        )
+        .sort("lat_cell", "lon_cell")
+        .collect()
+    )
+
+    missing_population = index.filter(pl.col("population").is_null())
+    if not missing_population.is_empty():
+        log.warning(
+            f"{missing_population.height:,} counties without population figures"
+        )
+    count_cells = index.select("lat_cell", "lon_cell").n_unique()
+    log.info(
+        f"County index: {index.height:,} counties in {count_cells:,}"
+        f" grid cells of {cell_size_deg} degrees"
+    )
+    return index
+
+
+def enrich_airports_spatially(
+    airports: pl.DataFrame,
+    county_index: pl.DataFrame,
+    params: Dict[str, Any],
+) -> pl.DataFrame:
+    """Assigns each airport to the county (and metro area) with the nearest centroid,
+    and computes the population of all counties within the catchment radius
+    """
+    cell_size_deg = params["cell_size_deg"]
+    ldf_airports = airports.lazy().select(
+        pl.col("airport").cast(pl.Utf8),
+        pl.col("latitude"),
+        pl.col("longitude"),
+    )
+    ldf_index = county_index.lazy()
+
+    nearest_county = (
+        _candidate_counties(
+            ldf_airports, ldf_index, params["county_search_radius_km"], cell_size_deg
+        )
+        .sort("distance_km")
+        .groupby("airport")
+        .agg(
+            pl.first("fips").alias("county_fips"),
+            pl.first("county_name"),
+            pl.first("state_code").alias("county_state_code"),
+            pl.first("cbsa_code"),
+            pl.first("cbsa_title"),
+            pl.first("distance_km").alias("county_centroid_distance_km"),
+        )
+    )
+
+    catchment = (
+        _candidate_counties(
+            ldf_airports, ldf_index, params["catchment_radius_km"], cell_size_deg
+        )
+        .groupby("airport")
+        .agg(
+            catchment_population=pl.sum("population"),
+            count_catchment_counties=pl.count(),
+        )
+    )
+
+    result = (
+        ldf_airports.join(nearest_county, on="airport", how="left")
+        .join(catchment, on="airport", how="left")
+        .with_columns(
+            pl.col("catchment_population").fill_null(0),
+            pl.col("count_catchment_counties").fill_null(0),
+        )
+        .sort("airport")
+        .collect()
+    )
+
+    unassigned = result.filter(pl.col("county_fips").is_null())
+    if not unassigned.is_empty():
+        radius_km = params["county_search_radius_km"]
+        err = (
+            f"{unassigned.height:,} airports without a county centroid within"
+            f" {radius_km} km: {unassigned['airport'].to_list()}"
+        )
+        log.warning(rich_error_wrapper(err), extra={"markup": True})
+    else:
+        log.info(
+            rich_success_wrapper("All airports assigned to a county!"),
+            extra={"markup": True},
+        )
+    log.info(f"Schema of airport catchments: {result.schema}")
+    return result
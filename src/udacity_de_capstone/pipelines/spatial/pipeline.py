@@ -0,0 +1,38 @@
+"""
+This is a boilerplate pipeline 'spatial'
+generated using Kedro 0.18.8
+"""
+
+from kedro.pipeline import Pipeline, node, pipeline
+
+from .nodes import build_county_index, enrich_airports_spatially
+
+
+def create_pipeline(**kwargs) -> Pipeline:
+    return pipeline(
+        [
+            node(
+                func=build_county_index,
+                inputs=[
+                    "raw_county_centroids",
+                    "county_population_validated",
+                    "raw_metro_areas",
+                    "params:spatial",
+                ],
+                outputs="county_spatial_index",
+                name="build_county_spatial_index",
+                tags="spatial",
+            ),
+            node(
+                func=enrich_airports_spatially,
+                inputs=[
+                    "airports_validated",
+                    "county_spatial_index",
+                    "params:spatial",
+                ],
+                outputs="airport_catchments",
+                name="enrich_airports_spatially",
+                tags="spatial",
+            ),
+        ]
+    )
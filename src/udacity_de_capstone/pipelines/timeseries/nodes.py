@@ -0,0 +1,181 @@
+"""
+This is a boilerplate pipeline 'timeseries'
+generated using Kedro 0.18.8
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
+
+from udacity_de_capstone.partition_stats import (
+    PartitionStats,
+    load_partition_stats,
+    partition_sizes,
+)
+from udacity_de_capstone.scheduling import run_partitions
+from udacity_de_capstone.utils import lazy_import
+
+if TYPE_CHECKING:
+    import polars as pl
+else:
+    pl = lazy_import("polars")
+
+log = logging.getLogger(__name__)
+
+# series name -> column identifying a series
+SERIES_KEYS = {"airport": "origin", "carrier": "op_unique_carrier"}
+# columns of departures that are binned across partitions
+DEPARTURE_COLUMNS = ("dep_delay", "active_weather")
+
+
+def _bin_aggregations() -> List[pl.Expr]:
+    return [
+        pl.count().alias("count_departures"),
+        pl.mean("dep_delay").cast(pl.Float32).alias("avg_dep_delay"),
+        pl.col("dep_delay").quantile(0.9).cast(pl.Float32).alias("p90_dep_delay"),
+        (pl.col("active_weather") > 0)
+        .mean()
+        .cast(pl.Float32)
+        .alias("weather_active_share"),
+    ]
+
+
+def _bin_series(
+    departures: pl.LazyFrame, key: str, time_column: str, every: str
+) -> pl.LazyFrame:
+    """Time bins of `every` per value of `key`, with departure counts and delays"""
+    return (
+        departures.sort(time_column)
+        .groupby_dynamic(time_column, every=every, by=key)
+        .agg(_bin_aggregations())
+        .rename({time_column: "hour"})
+    )
+
+
+def _departures(df: pl.DataFrame, time_column: str) -> pl.LazyFrame:
+    return df.lazy().filter(
+        (pl.col("cancelled") == 0) & pl.col(time_column).is_not_null()
+    )
+
+
+def _split_partition(
+    df: pl.DataFrame, params: Dict[str, Any]
+) -> Tuple[Dict[str, pl.DataFrame], pl.DataFrame]:
+    """Bins the departures of a partition, except for bins near its boundaries.
+
+    Departures of a partition can fall into bins that also hold departures of
+    other partitions (e.g. flights on the last day of a month, departing after
+    midnight). Bins starting within `boundary_margin_hours` of the flight dates
+    of the partition are therefore not aggregated here: the departures falling
+    into them are returned as is, to be binned together with those of all other
+    partitions.
+    """
+    time_column, every = params["time_column"], params["every"]
+    margin = timedelta(hours=params["boundary_margin_hours"])
+    departures = _departures(df, time_column)
+
+    first_date, last_date = df.select(
+        pl.min("fl_date").cast(pl.Datetime(time_unit="us")).alias("first_date"),
+        pl.max("fl_date").cast(pl.Datetime(time_unit="us")).alias("last_date"),
+    ).row(0)
+    bin_start = pl.col(time_column).dt.truncate(every)
+    interior = (bin_start >= first_date + margin) & (
+        bin_start < last_date + timedelta(days=1) - margin
+    )
+
+    series = {
+        name: _bin_series(departures.filter(interior), key, time_column, every)
+        for name, key in SERIES_KEYS.items()
+    }
+    boundary = departures.filter(~interior).select(
+        time_column, *SERIES_KEYS.values(), *DEPARTURE_COLUMNS
+    )
+    frames = pl.collect_all([*series.values(), boundary])
+    return dict(zip(SERIES_KEYS, frames[:-1])), frames[-1]
+
+
+def _colliding_departures(
+    df: pl.DataFrame, bins: pl.DataFrame, key: str, params: Dict[str, Any]
+) -> pl.DataFrame:
+    """Departures of a partition falling into the given (hour, `key`) bins"""
+    time_column = params["time_column"]
+    return (
+        _departures(df, time_column)
+        .with_columns(pl.col(time_column).dt.truncate(params["every"]).alias("hour"))
+        .join(bins.lazy(), on=["hour", key], how="semi")
+        .select(time_column, *SERIES_KEYS.values(), *DEPARTURE_COLUMNS)
+        .collect()
+    )
+
+
+def agg_hourly_delays(
+    data: Dict[str, Callable[[], pl.DataFrame]],
+    data_stats: Dict[str, Callable[[], PartitionStats]],
+    params: Dict[str, Any],
+    scheduling: Dict[str, Any],
+) -> Tuple[pl.DataFrame, pl.DataFrame]:
+    """Create hourly time series of departures, mean and p90 departure delays,
+    and share of departures with active weather, per airport and per carrier.
+
+    The result is the same as binning the departures of all partitions at once.
+    Bins of a partition that also hold departures of other partitions outside
+    the boundary margin (e.g. reported months late) are rare: they are binned
+    again together with those, which reloads the partition.
+    """
+    time_column, every = params["time_column"], params["every"]
+    partials = run_partitions(
+        "agg_hourly_delays",
+        lambda _, df: _split_partition(df, params),
+        data,
+        partition_sizes(load_partition_stats(data_stats)),
+        scheduling,
+        size_of=lambda result: sum(s.estimated_size() for s in result[0].values()),
+    )
+
+    # bins near partition boundaries are computed from the departures of all partitions
+    boundary = pl.concat([b for _, b in partials.values()])
+    log.info(f"Departures in bins near partition boundaries: {boundary.height:,}")
+
+    outputs: List[pl.DataFrame] = []
+    for name, key in SERIES_KEYS.items():
+        series = {partition_id: s[name] for partition_id, (s, _) in partials.items()}
+        boundary_bins = (
+            _bin_series(boundary.lazy(), key, time_column, every)
+            .select("hour", key)
+            .collect()
+        )
+        departures = [boundary]
+        for partition_id, bins in series.items():
+            collisions = bins.join(boundary_bins, on=["hour", key], how="semi")
+            if collisions.is_empty():
+                continue
+            log.warning(
+                f"{collisions.height:,} {name} bins of {partition_id} also hold"
+                " departures of other partitions. Binning them together"
+            )
+            series[partition_id] = bins.join(collisions, on=["hour", key], how="anti")
+            departures.append(
+                _colliding_departures(
+                    data[partition_id](), collisions.select("hour", key), key, params
+                )
+            )
+
+        result = (
+            pl.concat(
+                [*series.values()]
+                + [
+                    _bin_series(
+                        pl.concat(departures).lazy(), key, time_column, every
+                    ).collect()
+                ]
+            )
+            .sort("hour", key)
+            .select("hour", pl.col(key).cast(pl.Categorical), pl.exclude("hour", key))
+        )
+        log.info(f"Hourly {name} series: {result.height:,} bins")
+        outputs.append(result)
+
+    log.info(f"Schema of hourly series: {outputs[0].schema}")
+    return tuple(outputs)
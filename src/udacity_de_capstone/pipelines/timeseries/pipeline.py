@@ -0,0 +1,27 @@
+"""
+This is a boilerplate pipeline 'timeseries'
+generated using Kedro 0.18.8
+"""
+
+from kedro.pipeline import Pipeline, node, pipeline
+
+from .nodes import agg_hourly_delays
+
+
+def create_pipeline(**kwargs) -> Pipeline:
+    return pipeline(
+        [
+            node(
+                func=agg_hourly_delays,
+                inputs=[
+                    "combined_all",
+                    "combined_all_stats",
+                    "params:timeseries",
+                    "params:scheduling",
+                ],
+                outputs=["hourly_airport_delays", "hourly_carrier_delays"],
+                name="create_hourly_delay_series",
+                tags="business",
+            ),
+        ]
+    )
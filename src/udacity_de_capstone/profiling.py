@@ -0,0 +1,217 @@
+"""
+Profiling of pipeline runs: polars query plans, operator timings, and Python stacks.
+
+While profiling, every ``LazyFrame.collect()`` (and ``pl.collect_all()``) made by
+nodes is replaced by ``LazyFrame.profile()``, and the optimized plan of the query
+(``LazyFrame.explain()``) is kept. Eager DataFrame operations, which polars runs
+as unoptimized lazy queries internally, are not profiled. In the meantime, Python
+stacks of all threads are sampled at a fixed interval.
+
+Queries are attributed to the node of the calling thread (a context variable), so
+nodes running concurrently, e.g. with the thread runner, are kept apart. Nodes are
+also entered again while their outputs are saved, since partitioned outputs may be
+computed lazily by the dataset, and their wall time runs until the last save.
+Worker threads of a node should be started with ``utils.map_in_context``.
+
+Everything is written to a directory per run:
+
+- `plans/<node>__<query>.txt`: optimized plan of every query
+- `operators.csv`: timings of every operator of every query, in microseconds
+- `stacks.folded`: sampled stacks in folded format, e.g. for `flamegraph.pl`
+- `summary.txt`: node wall times, and the slowest queries and operators
+"""
+
+from __future__ import annotations
+
+import csv
+import logging
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence
+
+from udacity_de_capstone.utils import lazy_import
+
+if TYPE_CHECKING:
+    import polars as pl
+else:
+    pl = lazy_import("polars")
+
+log = logging.getLogger(__name__)
+
+NO_NODE = "<no node>"
+OPERATOR_FIELDS = ["node", "query", "operator", "start_us", "end_us", "duration_us"]
+
+_current_node: ContextVar[str] = ContextVar("profiled_node", default=NO_NODE)
+
+
+class _StackSampler(threading.Thread):
+    """Samples the Python stacks of all other threads, counted per folded stack"""
+
+    def __init__(self, interval: float) -> None:
+        super().__init__(name="profiling-stack-sampler", daemon=True)
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+class QueryProfiler:
+    """Profiles polars queries and samples Python stacks, see module docstring.
+
+    Queries are attributed to the node of the calling thread, which the caller
+    (e.g. a hook) reports with `node_started`, and `enter_node` / `exit_node`
+    around the node run and every save of its outputs.
+    """
+
+    def __init__(
+        self, directory: Path, sample_interval: float, top_operators: int
+    ) -> None:
+        self.directory = directory
+        self.top_operators = top_operators
+        self.node_durations: Dict[str, float] = {}
+        self._node_starts: Dict[str, float] = {}
+        self._sampler = _StackSampler(sample_interval)
+        self._operators: List[Dict[str, Any]] = []
+        self._query_counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._original_collect: Optional[Callable] = None
+        self._original_collect_all: Optional[Callable] = None
+
+    def start(self) -> None:
+        (self.directory / "plans").mkdir(parents=True, exist_ok=True)
+        self._original_collect = pl.LazyFrame.collect
+        self._original_collect_all = pl.collect_all
+        pl.LazyFrame.collect = self._profiled_collect()
+        pl.collect_all = self._profiled_collect_all
+        self._sampler.start()
+        log.info(f"Profiling run into {self.directory}")
+
+    def stop(self) -> None:
+        self._sampler.stop()
+        pl.LazyFrame.collect = self._original_collect
+        pl.collect_all = self._original_collect_all
+        self._write()
+        log.info(f"Profile written to {self.directory}")
+
+    @property
+    def current_node(self) -> str:
+        """Node of the calling thread"""
+        return _current_node.get()
+
+    def node_started(self, node: str) -> None:
+        self._node_starts[node] = time.perf_counter()
+        self.enter_node(node)
+
+    def enter_node(self, node: str) -> None:
+        """Attributes queries of the calling thread to the node"""
+        _current_node.set(node)
+
+    def exit_node(self, node: str) -> None:
+        """Stops attributing queries of the calling thread to the node,
+        whose wall time so far is recorded
+        """
+        _current_node.set(NO_NODE)
+        self.node_durations[node] = time.perf_counter() - self._node_starts[node]
+
+    def _profiled_collect(self) -> Callable[..., pl.DataFrame]:
+        original_collect = self._original_collect
+        profiler = self
+
+        def collect(ldf: pl.LazyFrame, **kwargs: Any) -> pl.DataFrame:
+            # eager operations run unoptimized lazy queries
+            if kwargs.get("no_optimization"):
+                return original_collect(ldf, **kwargs)
+            return profiler._profile(ldf, **kwargs)
+
+        return collect
+
+    def _profiled_collect_all(
+        self, lazy_frames: Sequence[pl.LazyFrame], **kwargs: Any
+    ) -> List[pl.DataFrame]:
+        return [self._profile(ldf, **kwargs) for ldf in lazy_frames]
+
+    def _profile(self, ldf: pl.LazyFrame, **kwargs: Any) -> pl.DataFrame:
+        node = self.current_node
+        with self._lock:
+            self._query_counts[node] += 1
+            query = f"{node}__{self._query_counts[node]:03d}"
+        plan = ldf.explain()
+        (self.directory / "plans" / f"{query}.txt").write_text(plan, encoding="utf-8")
+
+        df, timings = ldf.profile(**kwargs)
+        rows = [
+            {
+                "node": node,
+                "query": query,
+                "operator": operator,
+                "start_us": start,
+                "end_us": end,
+                "duration_us": end - start,
+            }
+            for operator, start, end in timings.iter_rows()
+        ]
+        with self._lock:
+            self._operators.extend(rows)
+        return df
+
+    def _write(self) -> None:
+        with open(self.directory / "operators.csv", "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=OPERATOR_FIELDS)
+            writer.writeheader()
+            writer.writerows(self._operators)
+
+        with open(self.directory / "stacks.folded", "w", encoding="utf-8") as file:
+            for stack, count in self._sampler.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+        (self.directory / "summary.txt").write_text(self._summary(), encoding="utf-8")
+
+    def _summary(self) -> str:
+        query_durations: Dict[str, int] = defaultdict(int)
+        for row in self._operators:
+            query_durations[row["query"]] = max(
+                query_durations[row["query"]], row["end_us"]
+            )
+        slowest_queries = sorted(query_durations.items(), key=lambda q: -q[1])
+        slowest_operators = sorted(self._operators, key=lambda r: -r["duration_us"])
+
+        lines = ["Node wall times (s)"]
+        lines += [
+            f"  {duration:10.3f}  {node}"
+            for node, duration in sorted(
+                self.node_durations.items(), key=lambda n: -n[1]
+            )
+        ]
+        lines += ["", f"Slowest queries (ms), of {len(query_durations)} profiled"]
+        lines += [
+            f"  {duration / 1000:10.1f}  {query}"
+            for query, duration in slowest_queries[: self.top_operators]
+        ]
+        lines += ["", "Slowest operators (ms)"]
+        lines += [
+            f"  {row['duration_us'] / 1000:10.1f}  {row['query']}  {row['operator']}"
+            for row in slowest_operators[: self.top_operators]
+        ]
+        lines += ["", f"Sampled stacks: {sum(self._sampler.stacks.values()):,}"]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,299 @@
+"""
+Memory-aware scheduling of partition-parallel stages.
+
+The memory needed to process a partition is estimated from its in-memory size
+(see the ``estimated_size`` of partition sidecars), times a memory factor
+of the stage. Partitions are packed into batches such that the estimates of each
+batch fit into the memory budget. Partitions of a batch are processed concurrently,
+and batches one after another.
+
+Results of all partitions are either returned together (``run_partitions``), in
+which case results kept from previous batches are counted against the budget,
+or processed batch by batch while they are consumed (``run_partitions_lazily``),
+e.g. saved by a `PartitionedDataSet`, so that only one batch is held at a time.
+
+Memory factors are learned: while a batch is processed, the resident memory of the
+process is sampled, and its peak increase relative to the input size of the batch
+is recorded in a JSON history file per stage, which is used for the estimates of
+the same stage in future runs. Learned factors never go below the default one,
+since memory freed by previous batches and reused by the allocator does not show
+up as an increase.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from statistics import mean
+from typing import Any, Callable, Dict, List, Mapping, Optional, TypeVar
+
+from udacity_de_capstone.utils import map_in_context
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# partition id -> memory factor
+MemoryFactors = Dict[str, float]
+
+GB = 1024**3
+MEMORY_SAMPLE_INTERVAL = 0.01
+
+
+def pack_batches(costs: Mapping[str, float], budget: float) -> List[List[str]]:
+    """Packs partitions into batches with a total cost within the budget.
+
+    First fit decreasing: partitions are placed largest first, into the first
+    batch with enough room left. Partitions over budget get a batch of their own.
+    """
+    batches: List[List[str]] = []
+    room: List[float] = []
+    for partition_id in sorted(costs, key=lambda p: (-costs[p], p)):
+        cost = costs[partition_id]
+        for i, left in enumerate(room):
+            if cost <= left:
+                batches[i].append(partition_id)
+                room[i] -= cost
+                break
+        else:
+            batches.append([partition_id])
+            room.append(budget - cost)
+    return batches
+
+
+def pack_batches_in_order(costs: Mapping[str, float], budget: float) -> List[List[str]]:
+    """Packs consecutive partitions (in the order of `costs`) into batches
+    with a total cost within the budget, e.g. for consuming results in that order.
+    Partitions over budget get a batch of their own.
+    """
+    batches: List[List[str]] = []
+    left = 0.0
+    for partition_id, cost in costs.items():
+        if batches and cost <= left:
+            batches[-1].append(partition_id)
+            left -= cost
+        else:
+            batches.append([partition_id])
+            left = budget - cost
+    return batches
+
+
+def _resident_memory() -> Optional[int]:
+    """Resident memory of the process in bytes, if available (Linux only)"""
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as file:
+            pages = int(file.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class _PeakMemory:
+    """Samples the resident memory of the process in a background thread,
+    keeping its peak increase over the memory when entering the context
+    """
+
+    def __init__(self, interval: float = MEMORY_SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self.baseline = _resident_memory()
+        self.peak = self.baseline
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._sample, name="scheduling-memory-sampler", daemon=True
+        )
+
+    @property
+    def increase(self) -> Optional[int]:
+        if self.baseline is None:
+            return None
+        return self.peak - self.baseline
+
+    def _update(self) -> None:
+        rss = _resident_memory()
+        if rss is not None:
+            self.peak = max(self.peak, rss)
+
+    def _sample(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._update()
+
+    def __enter__(self) -> _PeakMemory:
+        if self.baseline is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self.baseline is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._update()
+
+
+def load_memory_factors(path: Path) -> MemoryFactors:
+    """Memory factors of a stage, recorded in previous runs"""
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_memory_factors(path: Path, factors: MemoryFactors) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(factors, file, indent=4, sort_keys=True)
+
+
+class _Scheduler:
+    """Memory factors, costs, and batch processing of a stage"""
+
+    def __init__(
+        self,
+        stage: str,
+        func: Callable[[str, T], R],
+        partitions: Mapping[str, Callable[[], T]],
+        sizes: Mapping[str, int],
+        params: Dict[str, Any],
+    ) -> None:
+        self.stage = stage
+        self.func = func
+        self.partitions = partitions
+        self.sizes = sizes
+        self.min_factor = params["default_memory_factor"]
+        self.max_workers = params["max_workers"]
+        self.budget = params["memory_budget_gb"] * GB
+        self.history_path = Path(params["history_dir"]) / f"{stage}.json"
+
+        self.factors = load_memory_factors(self.history_path)
+        default_factor = max(
+            mean(self.factors.values()) if self.factors else 0, self.min_factor
+        )
+        self.costs = {
+            partition_id: sizes[partition_id]
+            * max(self.factors.get(partition_id, default_factor), self.min_factor)
+            for partition_id in partitions
+        }
+
+    def run_batch(self, i: int, batch: List[str]) -> Dict[str, R]:
+        """Processes the partitions of a batch concurrently,
+        and records their memory factors
+        """
+        batch_cost = sum(self.costs[p] for p in batch) / GB
+        log.info(f"Batch {i} of {self.stage}: {batch} (~{batch_cost:.2f} GB)")
+        with _PeakMemory() as memory:
+            with ThreadPoolExecutor(min(len(batch), self.max_workers)) as executor:
+                results = dict(
+                    zip(
+                        batch,
+                        map_in_context(
+                            executor,
+                            lambda p: self.func(p, self.partitions[p]()),
+                            batch,
+                        ),
+                    )
+                )
+
+        # concurrent partitions cannot be told apart: they share the batch factor
+        input_size = max(sum(self.sizes[p] for p in batch), 1)
+        if memory.increase is not None:
+            factor = max(memory.increase / input_size, self.min_factor)
+            log.info(f"Peak memory increase: {memory.increase / GB:.2f} GB")
+        else:
+            factor = self.min_factor
+        for partition_id in batch:
+            self.factors[partition_id] = factor
+        save_memory_factors(self.history_path, self.factors)
+        return results
+
+
+def run_partitions(
+    stage: str,
+    func: Callable[[str, T], R],
+    partitions: Mapping[str, Callable[[], T]],
+    sizes: Mapping[str, int],
+    params: Dict[str, Any],
+    size_of: Callable[[R], int] = lambda result: result.estimated_size(),
+) -> Dict[str, R]:
+    """Applies `func` to every partition, scheduled within the memory budget.
+
+    Results are kept until all partitions are processed, so the results of previous
+    batches are counted against the budget of the next ones. Use
+    ``run_partitions_lazily`` for results as large as the partitions.
+
+    Args:
+        stage: name of the stage, under which memory factors are recorded
+        func: work on a single partition, called with its id and loaded data
+        partitions: lazy loaders of the partitions, e.g. from a `PartitionedDataSet`
+        sizes: in-memory size of each partition in bytes, e.g. from its sidecar
+        params: scheduling parameters: `memory_budget_gb`, `max_workers`,
+            `default_memory_factor`, and `history_dir`
+        size_of: in-memory size of a result in bytes
+
+    Returns:
+        Results per partition, in the order of `partitions`
+    """
+    scheduler = _Scheduler(stage, func, partitions, sizes, params)
+    log.info(
+        f"Scheduling {len(partitions)} partitions of {stage}"
+        f" within {params['memory_budget_gb']} GB"
+    )
+
+    results: Dict[str, R] = {}
+    retained = 0
+    remaining = dict(scheduler.costs)
+    i = 0
+    while remaining:
+        available = scheduler.budget - retained
+        if available <= 0:
+            log.warning(
+                f"Results of {stage} exceed the memory budget: {retained / GB:.2f} GB"
+            )
+        # the next batch is packed with the room left after previous results
+        batch = pack_batches(remaining, max(available, 0))[0]
+        batch_results = scheduler.run_batch(i, batch)
+        retained += sum(size_of(result) for result in batch_results.values())
+        results.update(batch_results)
+        for partition_id in batch:
+            del remaining[partition_id]
+        i += 1
+
+    return {partition_id: results[partition_id] for partition_id in partitions}
+
+
+def run_partitions_lazily(
+    stage: str,
+    func: Callable[[str, T], R],
+    partitions: Mapping[str, Callable[[], T]],
+    sizes: Mapping[str, int],
+    params: Dict[str, Any],
+) -> Dict[str, Callable[[], R]]:
+    """Same as ``run_partitions``, except that partitions are only processed when
+    their results are requested, e.g. when a `PartitionedDataSet` saves them.
+
+    Batches hold consecutive partitions, in the order of `partitions` (which should
+    be the order in which results are requested, e.g. sorted by partition id).
+    Requesting the result of a partition processes its whole batch, and the other
+    results of the batch are kept until they are requested, once.
+    """
+    scheduler = _Scheduler(stage, func, partitions, sizes, params)
+    batches = pack_batches_in_order(scheduler.costs, scheduler.budget)
+    batch_of = {p: i for i, batch in enumerate(batches) for p in batch}
+    log.info(
+        f"Scheduled {len(partitions)} partitions of {stage} in {len(batches)}"
+        f" consecutive batches within {params['memory_budget_gb']} GB"
+    )
+    pending: Dict[str, R] = {}
+
+    def _result(partition_id: str) -> R:
+        if partition_id not in pending:
+            i = batch_of[partition_id]
+            pending.update(scheduler.run_batch(i, batches[i]))
+        return pending.pop(partition_id)
+
+    return {
+        partition_id: (lambda p=partition_id: _result(p)) for partition_id in partitions
+    }
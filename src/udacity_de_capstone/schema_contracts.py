@@ -0,0 +1,126 @@
+"""
+Schema contracts of the project's output datasets.
+
+The data dictionary in `docs/data_dictionary` holds the schema of every
+output dataset as a JSON mapping of column names to polars data types.
+Outputs are checked against these before being saved, which only requires
+their schema, so drift (e.g., a changed data type) is caught as soon as
+the dataset is produced rather than by downstream consumers.
+Partitions that are only computed while being saved are checked upfront
+if they come with the schema of their lazy plan (see ``PlannedPartition``),
+and once more when computed.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping
+
+from udacity_de_capstone.utils import rich_error_wrapper
+
+if TYPE_CHECKING:
+    import polars as pl
+
+log = logging.getLogger(__name__)
+
+Schema = Dict[str, str]
+
+DATA_DICTIONARY_DIR = Path("docs") / "data_dictionary"
+
+# dataset name -> data dictionary entry
+SCHEMA_CONTRACTS = {
+    "combined_all": "schema_complete_data",
+    "operating_carrier_stats": "schema_operating_carrier_stats",
+    "state_stats": "schema_state_stats",
+    "departure_airport_stats": "schema_departure_airport_stats",
+}
+
+
+class PlannedPartition:
+    """A partition computed when it is saved, along with the schema of its plan"""
+
+    def __init__(
+        self, load: Callable[[], Any], schema: Mapping[str, pl.PolarsDataType]
+    ) -> None:
+        self.load = load
+        self.schema = schema
+
+    def __call__(self) -> Any:
+        return self.load()
+
+
+def schema_to_dict(schema: Mapping[str, pl.PolarsDataType]) -> Schema:
+    """Converts a polars schema into its data dictionary representation"""
+    return {name: str(dtype) for name, dtype in schema.items()}
+
+
+def load_contracts(directory: Path) -> Dict[str, Schema]:
+    """Loads the schema contracts of all datasets from the data dictionary"""
+    contracts: Dict[str, Schema] = {}
+    for dataset_name, entry in SCHEMA_CONTRACTS.items():
+        with open(directory / f"{entry}.json", encoding="utf-8") as file:
+            contracts[dataset_name] = json.load(file)
+    return contracts
+
+
+def schema_violations(expected: Schema, actual: Schema) -> List[str]:
+    """Lists the differences between a schema and its contract.
+    Column order is not part of the contract.
+    """
+    violations = [f"missing column '{col}'" for col in expected if col not in actual]
+    violations += [
+        f"unexpected column '{col}' ({dtype})"
+        for col, dtype in actual.items()
+        if col not in expected
+    ]
+    violations += [
+        f"column '{col}' is {actual[col]}, expected {dtype}"
+        for col, dtype in expected.items()
+        if col in actual and actual[col] != dtype
+    ]
+    return violations
+
+
+def check_schema(
+    dataset_name: str, expected: Schema, schema: Mapping[str, pl.PolarsDataType]
+) -> None:
+    """Raises if a schema violates the contract of a dataset"""
+    violations = schema_violations(expected, schema_to_dict(schema))
+    if violations:
+        err = f"Schema contract of {dataset_name} violated: {'; '.join(violations)}"
+        log.error(rich_error_wrapper(err), extra={"markup": True})
+        raise ValueError(err)
+
+
+def _checked_loader(
+    dataset_name: str, expected: Schema, load: Callable[[], Any]
+) -> Callable[[], Any]:
+    def _load() -> Any:
+        data = load()
+        check_schema(dataset_name, expected, data.schema)
+        return data
+
+    return _load
+
+
+def enforce_contract(dataset_name: str, expected: Schema, data: Any) -> None:
+    """Checks data to be saved against the contract of its dataset.
+
+    For partitioned data, every partition is checked. Lazily saved partitions
+    (callables) are wrapped in place, so they are checked when materialized.
+    Planned partitions are checked right away as well, before any is computed.
+    """
+    if not isinstance(data, dict):
+        check_schema(dataset_name, expected, data.schema)
+        return
+
+    for partition_id, partition in data.items():
+        partition_name = f"{dataset_name}/{partition_id}"
+        if isinstance(partition, PlannedPartition):
+            check_schema(partition_name, expected, partition.schema)
+        if callable(partition):
+            data[partition_id] = _checked_loader(partition_name, expected, partition)
+        else:
+            check_schema(partition_name, expected, partition.schema)
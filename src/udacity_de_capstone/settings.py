@@ -3,8 +3,9 @@ from the Kedro defaults. For further information, including these default values
 https://kedro.readthedocs.io/en/stable/kedro_project_setup/settings.html."""
 
 # Instantiated project hooks.
-# from udacity_de_capstone.hooks import ProjectHooks
-# HOOKS = (ProjectHooks(),)
+from udacity_de_capstone.hooks import ProfilingHooks, SchemaContractHooks
+
+HOOKS = (SchemaContractHooks(), ProfilingHooks())
 
 # Installed plugins for which to disable hook auto-registration.
 # DISABLE_HOOKS_FOR_PLUGINS = ("kedro-viz",)
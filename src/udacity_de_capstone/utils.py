@@ -3,7 +3,15 @@ General utilities of the project.
 Not my favorite kind of module to have, but oh well...
 """
 
-from typing import Iterable, List
+import contextvars
+import importlib.util
+import sys
+from concurrent.futures import Executor
+from types import ModuleType
+from typing import Callable, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 def format_column_names(cols: Iterable[str]) -> List[str]:
@@ -33,3 +41,37 @@ def rich_success_wrapper(msg: str) -> str:
         log.info(rich_success_wrapper(err), extra={"markup": True})
     """
     return f"[green]{msg}[/]"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Imports a module lazily, i.e., it is only executed on first attribute access.
+
+    Keeps heavy dependencies (e.g., polars) out of the CLI startup path,
+    as Kedro imports all pipeline and node modules just to build the pipelines.
+
+    Example:
+        pl = lazy_import("polars")
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def map_in_context(
+    executor: Executor, func: Callable[[T], R], items: Iterable[T]
+) -> Iterator[R]:
+    """Same as ``executor.map(func, items)``, except that `func` runs in a copy of
+    the caller's context, so that context variables (e.g., the node a profiled
+    query is attributed to) carry over to the worker threads.
+    """
+    tasks = [(contextvars.copy_context(), item) for item in items]
+    return executor.map(lambda task: task[0].run(func, task[1]), tasks)